@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import logging
+import os
+import sys
+
+from Rom import LocalRom, RomPatch
+from Utils import output_path
+
+
+def apply_delta(base, file):
+    # the rom of a .erpt file written with --delta, base is a LocalRom of the randomizer base rom
+    patch = RomPatch.read(file)
+    if patch.source_hash is not None and patch.source_hash != base.base_hash:
+        raise RuntimeError('%s was made for a different base rom, it needs the one of the randomizer version it was generated with.' % file)
+    buffer = patch.apply(bytearray(base.buffer))
+    if patch.target_hash is not None and hashlib.md5(buffer).hexdigest() != patch.target_hash:
+        raise RuntimeError('Applying %s did not give the expected rom.' % file)
+    return buffer
+
+def main():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter, description='Turn .erpt files written with --delta into roms.')
+    parser.add_argument('--rom', default='Zelda no Densetsu - Kamigami no Triforce (Japan).sfc', help='Path to an ALttP JAP(1.0) rom to use as a base.')
+    parser.add_argument('--loglevel', default='info', const='info', nargs='?', choices=['error', 'info', 'warning', 'debug'], help='Select level of logging for output.')
+    parser.add_argument('delta', nargs='+', help='.erpt files to apply, each is written to a .sfc of the same name.')
+    args = parser.parse_args()
+
+    # set up logger
+    loglevel = {'error': logging.ERROR, 'info': logging.INFO, 'warning': logging.WARNING, 'debug': logging.DEBUG}[args.loglevel]
+    logging.basicConfig(format='%(message)s', level=loglevel)
+
+    # the rom itself is checked by LocalRom, each patch checks that it is applied to the right base rom
+    if not os.path.isfile(args.rom):
+        logging.getLogger('').error('Could not find valid base rom for patching at expected path %s. Please run with -h to see help for further information.', args.rom)
+        sys.exit(1)
+
+    # the base rom is only patched once for all deltas
+    base = LocalRom(args.rom)
+    for file in args.delta:
+        buffer = apply_delta(base, file)
+        outfile = output_path('%s.sfc' % os.path.splitext(os.path.basename(file))[0])
+        with open(outfile, 'wb') as stream:
+            stream.write(buffer)
+        logging.getLogger('').info('Wrote %s', outfile)
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,11 @@ import copy
 from enum import Enum, unique
 import logging
 import json
-from collections import OrderedDict
+import types
+from bisect import bisect_left
+from collections import OrderedDict, Counter, deque
 from Utils import int16_as_bytes
+from WorldGraph import WorldGraph
 
 class World(object):
 
@@ -25,10 +28,22 @@ class World(object):
         self.required_medallions = ['Ether', 'Quake']
         self._cached_entrances = None
         self._cached_locations = None
-        self._entrance_cache = {}
+        self._cached_rule_dependents = None
+        # kept up to date by the locations whenever their item or event flag changes, see update_location
+        self._filled_locations = LocationsById()
+        self._unfilled_locations = LocationsById()
+        self._event_locations = LocationsById()
+        # item name -> locations holding an item of that name
+        self._placements = {}
         self._region_cache = {}
         self._entrance_cache = {}
         self._location_cache = {}
+        self._dungeon_cache = {}
+        # everything indexed by its integer id, see index_world
+        self.regions_by_id = []
+        self.entrances_by_id = []
+        self.locations_by_id = []
+        self.dungeons_by_id = []
         self.required_locations = []
         self.place_dungeon_items = place_dungeon_items  # configurable in future
         self.shuffle_bonk_prizes = False
@@ -71,12 +86,111 @@ class World(object):
         self.hints = hints
         self.dynamic_regions = []
         self.dynamic_locations = []
+        self.spawn_regions = []
         self.spoiler = Spoiler(self)
         self.lamps_needed_for_dark_rooms = 1
 
     def intialize_regions(self):
         for region in self.regions:
             region.world = self
+        self.index_world()
+
+    def index_world(self):
+        # give all regions, entrances, locations and dungeons dense integer ids, which are their positions in the
+        # *_by_id lists, and build the complete name lookups. needs to be redone whenever any of them are added
+        self.regions_by_id = list(self.regions)
+        self.entrances_by_id = [exit for region in self.regions for exit in region.exits]
+        self.locations_by_id = [location for region in self.regions for location in region.locations]
+        self.dungeons_by_id = list(self.dungeons)
+        for objects in [self.regions_by_id, self.entrances_by_id, self.locations_by_id, self.dungeons_by_id]:
+            for id, obj in enumerate(objects):
+                obj.id = id
+        self._region_cache = {region.name: region for region in self.regions_by_id}
+        self._entrance_cache = {entrance.name: entrance for entrance in self.entrances_by_id}
+        self._location_cache = {location.name: location for location in self.locations_by_id}
+        self._dungeon_cache = {dungeon.name: dungeon for dungeon in self.dungeons_by_id}
+        self._filled_locations = LocationsById()
+        self._unfilled_locations = LocationsById()
+        self._event_locations = LocationsById()
+        self._placements = {}
+        for location in self.locations_by_id:
+            self.update_location(location)
+
+    def clone(self):
+        # structural copy of everything that changes while generating a seed: placements, connections, events,
+        # shops and bosses. item data and the rules already built for this world are shared with the copy
+        ret = copy.copy(self)
+        ret.required_medallions = list(self.required_medallions)
+        ret.required_locations = []
+        ret.spoiler = Spoiler(ret)
+        ret._cached_entrances = None
+        ret._cached_locations = None
+        ret._filled_locations = LocationsById()
+        ret._unfilled_locations = LocationsById()
+        ret._event_locations = LocationsById()
+        ret._placements = {}
+        ret._cached_rule_dependents = None
+
+        # maps every region, entrance, location, dungeon and shop of this world to its copy
+        copies = {}
+        for region in self.regions:
+            copies[region] = copy_slots(region)
+            for exit in region.exits:
+                copies[exit] = copy_slots(exit)
+            for location in region.locations:
+                copies[location] = copy_slots(location)
+        for dungeon in self.dungeons:
+            copies[dungeon] = copy.copy(dungeon)
+        for shop in self.shops:
+            copies[shop] = copy.copy(shop)
+
+        for dungeon in self.dungeons:
+            copied_dungeon = copies[dungeon]
+            copied_dungeon.big_key = dungeon.big_key.copy() if dungeon.big_key is not None else None
+            copied_dungeon.small_keys = [item.copy() for item in dungeon.small_keys]
+            copied_dungeon.dungeon_items = [item.copy() for item in dungeon.dungeon_items]
+            copied_dungeon.bosses = dict(dungeon.bosses)
+
+        for shop in self.shops:
+            copied_shop = copies[shop]
+            copied_shop.region = copies[shop.region]
+            copied_shop.inventory = copy.copy(shop.inventory)
+
+        for region in self.regions:
+            copied_region = copies[region]
+            copied_region.world = ret
+            copied_region.entrances = [copies[entrance] for entrance in region.entrances]
+            copied_region.exits = [copies[exit] for exit in region.exits]
+            copied_region.locations = [copies[location] for location in region.locations]
+            copied_region.dungeon = copies.get(region.dungeon)
+            copied_region.shop = copies.get(region.shop)
+            if region.spawn_rule is not None:
+                copied_region.spawn_rule = rebind_rule(region.spawn_rule, copies)
+            for exit in region.exits:
+                copied_exit = copies[exit]
+                copied_exit.parent_region = copied_region
+                copied_exit.connected_region = copies.get(exit.connected_region)
+                copied_exit.access_rule = rebind_rule(exit.access_rule, copies)
+            for location in region.locations:
+                copied_location = copies[location]
+                copied_location.parent_region = copied_region
+                copied_location.access_rule = rebind_rule(location.access_rule, copies)
+                if location.item is not None:
+                    copied_location.item = location.item.copy()
+                    copied_location.item.location = copied_location
+
+        ret.regions = [copies[region] for region in self.regions]
+        ret.dungeons = [copies[dungeon] for dungeon in self.dungeons]
+        ret.shops = [copies[shop] for shop in self.shops]
+        ret.dynamic_regions = [copies[region] for region in self.dynamic_regions]
+        ret.dynamic_locations = [copies[location] for location in self.dynamic_locations]
+        ret.spawn_regions = [copies[region] for region in self.spawn_regions]
+        ret.itempool = [item.copy() for item in self.itempool]
+        ret.index_world()
+
+        ret.state = CollectionState(ret)
+        ret.state.prog_items = self.state.prog_items.copy()
+        return ret
 
     def get_region(self, regionname):
         if isinstance(regionname, Region):
@@ -84,10 +198,6 @@ class World(object):
         try:
             return self._region_cache[regionname]
         except KeyError:
-            for region in self.regions:
-                if region.name == regionname:
-                    self._region_cache[regionname] = region
-                    return region
             raise RuntimeError('No such region %s' % regionname)
 
     def get_entrance(self, entrance):
@@ -96,11 +206,6 @@ class World(object):
         try:
             return self._entrance_cache[entrance]
         except KeyError:
-            for region in self.regions:
-                for exit in region.exits:
-                    if exit.name == entrance:
-                        self._entrance_cache[entrance] = exit
-                        return exit
             raise RuntimeError('No such entrance %s' % entrance)
 
     def get_location(self, location):
@@ -109,21 +214,68 @@ class World(object):
         try:
             return self._location_cache[location]
         except KeyError:
-            for region in self.regions:
-                for r_location in region.locations:
-                    if r_location.name == location:
-                        self._location_cache[location] = r_location
-                        return r_location
-        raise RuntimeError('No such location %s' % location)
+            raise RuntimeError('No such location %s' % location)
 
     def get_dungeon(self, dungeonname):
         if isinstance(dungeonname, Dungeon):
             return dungeonname
-
-        for dungeon in self.dungeons:
-            if dungeon.name == dungeonname:
-                return dungeon
-        raise RuntimeError('No such dungeon %s' % dungeonname)
+        try:
+            return self._dungeon_cache[dungeonname]
+        except KeyError:
+            raise RuntimeError('No such dungeon %s' % dungeonname)
+
+    def export_graph(self):
+        # the region graph with its item rules as arrays, see WorldGraph
+        rules = []
+        rule_ids = {}
+
+        def rule_id(rule):
+            clauses = rule_clauses(rule, self)
+            # opaque rules each get their own id, so callers can fill in their results individually
+            key = tuple(tuple(sorted(clause)) for clause in clauses) if clauses is not None else rule
+            if key not in rule_ids:
+                rule_ids[key] = len(rules)
+                rules.append(clauses)
+            return rule_ids[key]
+
+        entrance_rules = [rule_id(entrance.access_rule) for entrance in self.entrances_by_id]
+        location_rules = [rule_id(location.access_rule) for location in self.locations_by_id]
+        spawn_rules = [rule_id(region.spawn_rule) for region in self.spawn_regions]
+
+        item_names = sorted({item for clauses in rules if clauses is not None for clause in clauses for item, _ in clause})
+        item_ids = {name: id for id, name in enumerate(item_names)}
+        rule_indptr = [0]
+        clause_indptr = [0]
+        term_items = []
+        term_counts = []
+        for clauses in rules:
+            for clause in clauses or []:
+                for item, count in clause:
+                    term_items.append(item_ids[item])
+                    term_counts.append(count)
+                clause_indptr.append(len(term_items))
+            rule_indptr.append(len(clause_indptr) - 1)
+
+        exit_indptr = [0]
+        for region in self.regions_by_id:
+            exit_indptr.append(exit_indptr[-1] + len(region.exits))
+
+        return WorldGraph(region_names=[region.name for region in self.regions_by_id],
+                          entrance_names=[entrance.name for entrance in self.entrances_by_id],
+                          location_names=[location.name for location in self.locations_by_id],
+                          item_names=item_names,
+                          exit_indptr=exit_indptr,
+                          entrance_targets=[entrance.connected_region.id if entrance.connected_region is not None else -1 for entrance in self.entrances_by_id],
+                          entrance_rules=entrance_rules,
+                          location_regions=[location.parent_region.id for location in self.locations_by_id],
+                          location_rules=location_rules,
+                          spawn_regions=[region.id for region in self.spawn_regions],
+                          spawn_rules=spawn_rules,
+                          rule_indptr=rule_indptr,
+                          clause_indptr=clause_indptr,
+                          term_items=term_items,
+                          term_counts=term_counts,
+                          opaque_rules=[clauses is None for clauses in rules])
 
     def get_all_state(self, keys=False):
         ret = CollectionState(self)
@@ -134,34 +286,34 @@ class World(object):
                     if ret.has('Golden Sword'):
                         pass
                     elif ret.has('Tempered Sword') and self.difficulty_requirements.progressive_sword_limit >= 4:
-                        ret.prog_items.append('Golden Sword')
+                        ret.prog_items['Golden Sword'] += 1
                     elif ret.has('Master Sword') and self.difficulty_requirements.progressive_sword_limit >= 3:
-                        ret.prog_items.append('Tempered Sword')
+                        ret.prog_items['Tempered Sword'] += 1
                     elif ret.has('Fighter Sword') and self.difficulty_requirements.progressive_sword_limit >= 2:
-                        ret.prog_items.append('Master Sword')
+                        ret.prog_items['Master Sword'] += 1
                     elif self.difficulty_requirements.progressive_sword_limit >= 1:
-                        ret.prog_items.append('Fighter Sword')
+                        ret.prog_items['Fighter Sword'] += 1
                 elif 'Glove' in item.name:
                     if ret.has('Titans Mitts'):
                         pass
                     elif ret.has('Power Glove'):
-                        ret.prog_items.append('Titans Mitts')
+                        ret.prog_items['Titans Mitts'] += 1
                     else:
-                        ret.prog_items.append('Power Glove')
+                        ret.prog_items['Power Glove'] += 1
                 elif 'Shield' in item.name:
                     if ret.has('Mirror Shield'):
                         pass
                     elif ret.has('Red Shield') and self.difficulty_requirements.progressive_shield_limit >= 3:
-                        ret.prog_items.append('Mirror Shield')
+                        ret.prog_items['Mirror Shield'] += 1
                     elif ret.has('Blue Shield')  and self.difficulty_requirements.progressive_shield_limit >= 2:
-                        ret.prog_items.append('Red Shield')
+                        ret.prog_items['Red Shield'] += 1
                     elif self.difficulty_requirements.progressive_shield_limit >= 1:
-                        ret.prog_items.append('Blue Shield')
+                        ret.prog_items['Blue Shield'] += 1
             elif item.name.startswith('Bottle'):
                 if ret.bottle_count() < self.difficulty_requirements.progressive_bottle_limit:
-                    ret.prog_items.append(item.name)
+                    ret.prog_items[item.name] += 1
             elif item.advancement or item.key:
-                ret.prog_items.append(item.name)
+                ret.prog_items[item.name] += 1
 
         for item in self.itempool:
             soft_collect(item)
@@ -179,7 +331,18 @@ class World(object):
         return [loc.item for loc in self.get_filled_locations()] + self.itempool
 
     def find_items(self, item):
-        return [location for location in self.get_locations() if location.item is not None and location.item.name == item]
+        # locations holding an item of the given name, in the order of get_locations()
+        locations = self._placements.get(item)
+        return list(locations.locations) if locations else []
+
+    def find_item(self, item):
+        # the first location holding an item of the given name, None if it is not placed anywhere
+        locations = self._placements.get(item)
+        return locations.locations[0] if locations else None
+
+    def get_placements(self):
+        # item name -> locations holding it, for every placed item
+        return OrderedDict((name, self.find_items(name)) for name in sorted(self._placements))
 
     def push_item(self, location, item, collect=True):
         if not isinstance(location, Location):
@@ -204,6 +367,7 @@ class World(object):
 
     def clear_entrance_cache(self):
         self._cached_entrances = None
+        self.index_world()
 
     def get_locations(self):
         if self._cached_locations is None:
@@ -214,33 +378,84 @@ class World(object):
 
     def clear_location_cache(self):
         self._cached_locations = None
+        self.index_world()
+
+    def get_event_locations(self):
+        return list(self._event_locations.locations)
+
+    def update_location(self, location, previous=None):
+        # move a location between the filled, unfilled and event lists and the item placements after its item or event
+        # flag changed, previous is the item it held before. all of them stay in id order, which is the order of
+        # get_locations()
+        if location.id is None:
+            # not indexed yet, index_world picks it up
+            return
+        if previous is not None:
+            placed = self._placements.get(previous.name)
+            if placed is not None:
+                placed.discard(location)
+                if not placed:
+                    del self._placements[previous.name]
+        if location.item is not None:
+            self._placements.setdefault(location.item.name, LocationsById()).add(location)
+        if location.item is None:
+            self._filled_locations.discard(location)
+            self._unfilled_locations.add(location)
+        else:
+            self._unfilled_locations.discard(location)
+            self._filled_locations.add(location)
+        if location.event:
+            self._event_locations.add(location)
+        else:
+            self._event_locations.discard(location)
+
+    def get_rule_dependents(self, item):
+        # spots whose access rule may change when the given item is collected
+        # rules that are not plain item requirements (reachability, bosses, custom functions) depend on everything
+        if self._cached_rule_dependents is None:
+            dependents = {}
+            indirect = set()
+            for region in self.regions:
+                for spot in region.exits + region.locations:
+                    items = rule_items(spot.access_rule, self)
+                    if items is None:
+                        indirect.add(spot)
+                    else:
+                        for name in items:
+                            dependents.setdefault(name, set()).add(spot)
+            self._cached_rule_dependents = {name: frozenset(spots | indirect) for name, spots in dependents.items()}
+            self._cached_rule_dependents[None] = frozenset(indirect)
+        try:
+            return self._cached_rule_dependents[item]
+        except KeyError:
+            return self._cached_rule_dependents[None]
+
+    def clear_rule_cache(self):
+        self._cached_rule_dependents = None
 
     def get_unfilled_locations(self):
-        return [location for location in self.get_locations() if location.item is None]
+        return list(self._unfilled_locations.locations)
 
     def get_filled_locations(self):
-        return [location for location in self.get_locations() if location.item is not None]
+        return list(self._filled_locations.locations)
 
     def get_reachable_locations(self, state=None):
         if state is None:
             state = self.state
-        return [location for location in self.get_locations() if state.can_reach(location)]
+        # the locations of a region have consecutive ids, so going through the regions by id keeps the id order while
+        # skipping the locations of every region out of reach
+        return [location for region in self.regions_by_id if state.can_reach(region) for location in region.locations if state.can_reach(location)]
 
     def get_placeable_locations(self, state=None):
         if state is None:
             state = self.state
-        return [location for location in self.get_locations() if location.item is None and state.can_reach(location)]
+        return [location for location in self.get_unfilled_locations() if state.can_reach(location)]
 
     def unlocks_new_location(self, item):
-        temp_state = self.state.copy()
-        temp_state.clear_cached_unreachable()
-        temp_state.collect(item, True)
+        return bool(self.unlocks_new_locations([item]).locations(item))
 
-        for location in self.get_unfilled_locations():
-            if temp_state.can_reach(location) and not self.state.can_reach(location):
-                return True
-
-        return False
+    def unlocks_new_locations(self, items):
+        return UnlockedLocations(self, items)
 
     def has_beaten_game(self, state):
         if state.has('Triforce'):
@@ -262,26 +477,20 @@ class World(object):
         prog_locations = [location for location in self.get_locations() if location.item is not None and (location.item.advancement or location.event) and location not in state.locations_checked]
 
         treasure_pieces_collected = state.item_count('Triforce Piece') + state.item_count('Power Star')
-        while prog_locations:
-            sphere = []
-            # build up spheres of collection radius. Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-            for location in prog_locations:
-                if state.can_reach(location):
-                    if location.item.name == 'Triforce':
-                        return True
-                    elif location.item.name in ['Triforce Piece', 'Power Star']:
-                        treasure_pieces_collected += 1
-                    if self.goal in ['triforcehunt'] and treasure_pieces_collected >= self.treasure_hunt_count:
-                        return True
-                    sphere.append(location)
-
+        spheres = SphereSearch(state, prog_locations)
+        while spheres.candidates:
+            sphere = spheres.next_sphere()
             if not sphere:
                 # ran out of places and did not find triforce yet, quit
                 return False
 
             for location in sphere:
-                prog_locations.remove(location)
-                state.collect(location.item, True, location)
+                if location.item.name == 'Triforce':
+                    return True
+                elif location.item.name in ['Triforce Piece', 'Power Star']:
+                    treasure_pieces_collected += 1
+                if self.goal in ['triforcehunt'] and treasure_pieces_collected >= self.treasure_hunt_count:
+                    return True
 
         return False
 
@@ -315,105 +524,284 @@ class World(object):
         return id_value
 
 
+def copy_slots(obj):
+    # shallow copy of an object using __slots__, a lot faster than copy.copy for these
+    ret = object.__new__(type(obj))
+    for attribute in type(obj).__slots__:
+        setattr(ret, attribute, getattr(obj, attribute))
+    return ret
+
+def rebind_rule(rule, copies):
+    # compiled rules hold the spots and dungeons they look at as globals, a copy of the function points them at the
+    # copied world instead. all other rules only go through the state they are given and can be shared as they are
+    if not hasattr(rule, 'requirement'):
+        return rule
+    spots = {name: copies[value] for name, value in rule.__globals__.items() if isinstance(value, (Region, Entrance, Location, Dungeon))}
+    if not spots:
+        return rule
+    constants = dict(rule.__globals__)
+    constants.update(spots)
+    function = types.FunctionType(rule.__code__, constants, rule.__name__)
+    function.requirement = rule.requirement
+    return function
+
+
+class SphereSearch(object):
+    # collects the items at the given locations sphere by sphere: everything in a sphere is reachable with the items of the lower spheres.
+    # a copy of the state from before each sphere is kept, so a later search can resume from there instead of starting over
+
+    def __init__(self, state, locations, sweep_keys=False):
+        self.state = state
+        self.candidates = OrderedDict.fromkeys(locations)
+        self.sweep_keys = sweep_keys
+        self.checkpoints = []
+
+    def next_sphere(self):
+        self.checkpoints.append(self.state.copy())
+        if self.sweep_keys:
+            self.state.sweep_for_events(key_only=True)
+
+        sphere = [location for location in self.candidates if self.state.can_reach(location)]
+        for location in sphere:
+            del self.candidates[location]
+            self.state.collect(location.item, True, location)
+        return sphere
+
+    def checkpoint(self, sphere):
+        # state holding everything collected before the given sphere, with reachability to be worked out again
+        # as items may have been taken out of the world since
+        state = self.checkpoints[sphere].copy()
+        state.clear_cached_reachability()
+        return state
+
+
+class UnlockedLocations(object):
+    # the unfilled locations that become reachable by collecting each of the given items, see locations(). they are
+    # only worked out when asked for, as fill algorithms usually stop at the first item unlocking something, and the
+    # locations which are unreachable right now are only looked up once for all of them
+
+    def __init__(self, world, items):
+        self.world = world
+        self.items = {}
+        for item in items:
+            self.items.setdefault(item.name, item)
+        self.unreachable = None
+        self.unlocked = {}
+
+    def locations(self, item):
+        # item needs to be one of the given items, or one of the same name
+        try:
+            return self.unlocked[item.name]
+        except KeyError:
+            pass
+        if self.unreachable is None:
+            self.unreachable = [location for location in self.world.get_unfilled_locations() if not self.world.state.can_reach(location)]
+        temp_state = self.world.state.copy()
+        temp_state.collect(self.items[item.name], True)
+        unlocked = self.unlocked[item.name] = [location for location in self.unreachable if temp_state.can_reach(location)]
+        return unlocked
+
+
 class CollectionState(object):
 
+    # containers a copy starts out sharing with the state it was copied from
+    shareable = ('prog_items', 'reachable_regions', 'blocked_connections', 'location_cache', 'blocked_locations', 'unreached_locations', 'events', 'path', 'locations_checked')
+
+    __slots__ = shareable + ('world', 'stale', 'updating', 'changed_items', 'shared')
+
     def __init__(self, parent):
-        self.prog_items = []
+        self.prog_items = Counter()
         self.world = parent
-        self.region_cache = {}
+        self.reachable_regions = set()
+        self.blocked_connections = OrderedDict()
+        self.stale = True
+        self.updating = False
         self.location_cache = {}
-        self.entrance_cache = {}
-        self.recursion_count = 0
-        self.events = []
+        # negative location results are split by whether the location's own rule failed or its region was not reached yet
+        self.blocked_locations = set()
+        self.unreached_locations = set()
+        # item names collected since the last region update, None if everything has to be checked again
+        self.changed_items = None
+        self.events = set()
         self.path = {}
         self.locations_checked = set()
-
-
-    def clear_cached_unreachable(self):
+        self.shared = set()
+
+    def unshare(self, *attributes):
+        # copy on write: take a private copy of a container before the first mutation after copy()
+        for attribute in attributes:
+            if attribute in self.shared:
+                self.shared.remove(attribute)
+                setattr(self, attribute, copy.copy(getattr(self, attribute)))
+
+    def update_reachable_regions(self):
+        # forward propagation from the spawn regions: every exit out of a reachable region is either passed or kept
+        # as a blocked connection, which is all that has to be looked at again once the inventory grows
+        self.stale = False
+        self.updating = True
+        rrs = self.reachable_regions
+        blocked = self.blocked_connections
+        # connections blocked by rules on other items stay blocked, only look at the ones the new items can open up
+        if self.changed_items is None:
+            relevant = None
+        else:
+            relevant = self.world.get_rule_dependents(None).union(*[self.world.get_rule_dependents(item) for item in self.changed_items])
+        self.changed_items = frozenset()
+        # access rules may depend on the reachability of other spots, so repeat until nothing changes anymore
+        new_regions = True
+        while new_regions:
+            new_regions = False
+            spawned = set()
+            for region in self.world.spawn_regions:
+                if region not in rrs and region.spawn_rule(self):
+                    if self.shared:
+                        self.unshare('reachable_regions', 'blocked_connections', 'path')
+                        rrs = self.reachable_regions
+                        blocked = self.blocked_connections
+                    rrs.add(region)
+                    for entrance in region.entrances:
+                        blocked.pop(entrance, None)
+                    blocked.update((exit, None) for exit in region.exits if exit.connected_region not in rrs)
+                    spawned.update(region.exits)
+                    new_regions = True
+            if relevant is None:
+                queue = deque(blocked)
+            else:
+                queue = deque(connection for connection in blocked if connection in relevant or connection in spawned)
+            # after the first pass only rules depending on reachability can change their result
+            relevant = self.world.get_rule_dependents(None)
+            while queue:
+                connection = queue.popleft()
+                new_region = connection.connected_region
+                if new_region is None:
+                    continue
+                if new_region in rrs:
+                    continue
+                if connection.access_rule(self):
+                    if self.shared:
+                        self.unshare('reachable_regions', 'blocked_connections', 'path')
+                        rrs = self.reachable_regions
+                        blocked = self.blocked_connections
+                    rrs.add(new_region)
+                    # connections into the region are not blocked anymore
+                    for entrance in new_region.entrances:
+                        blocked.pop(entrance, None)
+                    if connection not in self.path:
+                        parent = connection.parent_region
+                        self.path[connection] = (connection.name, self.path.get(parent, (parent.name, None)))
+                    if new_region not in self.path:
+                        self.path[new_region] = (new_region.name, self.path[connection])
+                    blocked.update((exit, None) for exit in new_region.exits if exit.connected_region not in rrs)
+                    queue.extend(new_region.exits)
+                    new_regions = True
+        self.updating = False
+
+    def clear_cached_unreachable(self, item=None):
         # we only need to invalidate results which were False, places we could reach before we can still reach after adding more items
-        self.region_cache = {k: v for k, v in self.region_cache.items() if v}
-        self.location_cache = {k: v for k, v in self.location_cache.items() if v}
-        self.entrance_cache = {k: v for k, v in self.entrance_cache.items() if v}
+        # if we know which item was collected, only the locations whose rule could change because of it are looked at again
+        self.stale = True
+        if item is None:
+            self.changed_items = None
+            self.location_cache = {k: v for k, v in self.location_cache.items() if v}
+            self.blocked_locations = set()
+            self.unreached_locations = set()
+            self.shared.difference_update(['location_cache', 'blocked_locations', 'unreached_locations'])
+            return
+        if self.changed_items is not None:
+            self.changed_items = self.changed_items | {item}
+        self.clear_cached_dependents(self.world.get_rule_dependents(item))
+
+    def clear_cached_indirect(self):
+        # results of rules looking at more than the inventory, e.g. at where items are placed, have to be checked again
+        # the region update always looks at the connections with such rules again
+        self.stale = True
+        self.clear_cached_dependents(self.world.get_rule_dependents(None))
+
+    def clear_cached_dependents(self, dependents):
+        flipped = self.blocked_locations & dependents
+        if flipped or self.unreached_locations:
+            self.unshare('location_cache')
+            for location in flipped:
+                del self.location_cache[location]
+            for location in self.unreached_locations:
+                del self.location_cache[location]
+            if flipped:
+                self.blocked_locations = self.blocked_locations - flipped
+                self.shared.discard('blocked_locations')
+            self.unreached_locations = set()
+            self.shared.discard('unreached_locations')
 
     def copy(self):
+        # cheap layered copy: both states share all containers until one of them mutates a container
         ret = CollectionState(self.world)
-        ret.prog_items = copy.copy(self.prog_items)
-        ret.region_cache = copy.copy(self.region_cache)
-        ret.location_cache = copy.copy(self.location_cache)
-        ret.entrance_cache = copy.copy(self.entrance_cache)
-        ret.events = copy.copy(self.events)
-        ret.path = copy.copy(self.path)
-        ret.locations_checked = copy.copy(self.locations_checked)
+        for attribute in self.shareable:
+            setattr(ret, attribute, getattr(self, attribute))
+        ret.stale = self.stale
+        ret.changed_items = self.changed_items
+        ret.shared = set(self.shareable)
+        self.shared = set(self.shareable)
         return ret
 
     def can_reach(self, spot, resolution_hint=None):
         try:
             spot_type = spot.spot_type
-            if spot_type == 'Location':
-                correct_cache = self.location_cache
-            elif spot_type == 'Region':
-                correct_cache = self.region_cache
-            elif spot_type == 'Entrance':
-                correct_cache = self.entrance_cache
-            else:
-                raise AttributeError
         except AttributeError:
             # try to resolve a name
             if resolution_hint == 'Location':
                 spot = self.world.get_location(spot)
-                correct_cache = self.location_cache
             elif resolution_hint == 'Entrance':
                 spot = self.world.get_entrance(spot)
-                correct_cache = self.entrance_cache
             else:
                 # default to Region
                 spot = self.world.get_region(spot)
-                correct_cache = self.region_cache
-
-        if spot.recursion_count > 0:
-            return False
-
-        if spot not in correct_cache:
-            # for the purpose of evaluating results, recursion is resolved by always denying recursive access (as that ia what we are trying to figure out right now in the first place
-            spot.recursion_count += 1
-            self.recursion_count += 1
-            can_reach = spot.can_reach(self)
-            spot.recursion_count -= 1
-            self.recursion_count -= 1
-
-            # we only store qualified false results (i.e. ones not inside a hypothetical)
-            if not can_reach:
-                if self.recursion_count == 0:
-                    correct_cache[spot] = can_reach
-            else:
-                correct_cache[spot] = can_reach
-            return can_reach
-        return correct_cache[spot]
+            spot_type = spot.spot_type
+
+        if spot_type == 'Region':
+            if self.stale and not self.updating:
+                self.update_reachable_regions()
+            return spot in self.reachable_regions
+
+        if spot_type == 'Location':
+            try:
+                return self.location_cache[spot]
+            except KeyError:
+                can_reach = spot.can_reach(self)
+                # while the reachable regions are still being propagated a False result is not final yet
+                if can_reach or not self.updating:
+                    if 'location_cache' in self.shared:
+                        self.unshare('location_cache')
+                    self.location_cache[spot] = can_reach
+                    if not can_reach:
+                        if spot.parent_region in self.reachable_regions:
+                            self.unshare('blocked_locations')
+                            self.blocked_locations.add(spot)
+                        else:
+                            self.unshare('unreached_locations')
+                            self.unreached_locations.add(spot)
+                return can_reach
+
+        return spot.can_reach(self)
 
     def sweep_for_events(self, key_only=False):
-        # this may need improvement
-        new_locations = True
-        checked_locations = 0
-        while new_locations:
-            reachable_events = [location for location in self.world.get_filled_locations() if location.event and (not key_only or location.item.key) and self.can_reach(location)]
+        # only events not collected yet are candidates, and after each pass only those still out of reach are looked at again
+        events = [location for location in self.world.get_event_locations() if location.item is not None and (not key_only or location.item.key) and location.name not in self.events]
+        while events:
+            reachable_events = [event for event in events if self.can_reach(event)]
+            if not reachable_events:
+                break
+            self.unshare('events')
             for event in reachable_events:
-                if event.name not in self.events:
-                    self.events.append(event.name)
-                    self.collect(event.item, True, event)
-            new_locations = len(reachable_events) > checked_locations
-            checked_locations = len(reachable_events)
+                self.events.add(event.name)
+                self.collect(event.item, True, event)
+            events = [event for event in events if event.name not in self.events]
 
     def has(self, item, count=1):
-        if count == 1:
-            return item in self.prog_items
-        return self.item_count(item) >= count
+        return self.prog_items[item] >= count
 
     def has_key(self, item, count=1):
         if self.world.retro:
             return self.can_buy_unlimited('Small Key (Universal)')
-        if count == 1:
-            return item in self.prog_items
-        return self.item_count(item) >= count
+        return self.prog_items[item] >= count
 
     def can_buy_unlimited(self, item):
         for shop in self.world.shops:
@@ -422,7 +810,7 @@ class CollectionState(object):
         return False
 
     def item_count(self, item):
-        return len([pritem for pritem in self.prog_items if pritem == item])
+        return self.prog_items[item]
 
     def can_lift_rocks(self):
         return self.has('Power Glove') or self.has('Titans Mitts')
@@ -431,7 +819,7 @@ class CollectionState(object):
         return self.bottle_count() > 0
 
     def bottle_count(self):
-        return len([pritem for pritem in self.prog_items if pritem.startswith('Bottle')])
+        return sum(count for pritem, count in self.prog_items.items() if pritem.startswith('Bottle'))
 
     def has_hearts(self, count):
         # Warning: This only considers items that are marked as advancement items
@@ -520,58 +908,59 @@ class CollectionState(object):
 
     def collect(self, item, event=False, location=None):
         if location:
+            self.unshare('locations_checked')
             self.locations_checked.add(location)
-        changed = False
+        self.unshare('prog_items')
+        changed = None
         if item.name.startswith('Progressive '):
             if 'Sword' in item.name:
                 if self.has('Golden Sword'):
                     pass
                 elif self.has('Tempered Sword') and self.world.difficulty_requirements.progressive_sword_limit >= 4:
-                    self.prog_items.append('Golden Sword')
-                    changed = True
+                    self.prog_items['Golden Sword'] += 1
+                    changed = 'Golden Sword'
                 elif self.has('Master Sword') and self.world.difficulty_requirements.progressive_sword_limit >= 3:
-                    self.prog_items.append('Tempered Sword')
-                    changed = True
+                    self.prog_items['Tempered Sword'] += 1
+                    changed = 'Tempered Sword'
                 elif self.has('Fighter Sword') and self.world.difficulty_requirements.progressive_sword_limit >= 2:
-                    self.prog_items.append('Master Sword')
-                    changed = True
+                    self.prog_items['Master Sword'] += 1
+                    changed = 'Master Sword'
                 elif self.world.difficulty_requirements.progressive_sword_limit >= 1:
-                    self.prog_items.append('Fighter Sword')
-                    changed = True
+                    self.prog_items['Fighter Sword'] += 1
+                    changed = 'Fighter Sword'
             elif 'Glove' in item.name:
                 if self.has('Titans Mitts'):
                     pass
                 elif self.has('Power Glove'):
-                    self.prog_items.append('Titans Mitts')
-                    changed = True
+                    self.prog_items['Titans Mitts'] += 1
+                    changed = 'Titans Mitts'
                 else:
-                    self.prog_items.append('Power Glove')
-                    changed = True
+                    self.prog_items['Power Glove'] += 1
+                    changed = 'Power Glove'
             elif 'Shield' in item.name:
                 if self.has('Mirror Shield'):
                     pass
                 elif self.has('Red Shield') and self.world.difficulty_requirements.progressive_shield_limit >= 3:
-                    self.prog_items.append('Mirror Shield')
-                    changed = True
+                    self.prog_items['Mirror Shield'] += 1
+                    changed = 'Mirror Shield'
                 elif self.has('Blue Shield')  and self.world.difficulty_requirements.progressive_shield_limit >= 2:
-                    self.prog_items.append('Red Shield')
-                    changed = True
+                    self.prog_items['Red Shield'] += 1
+                    changed = 'Red Shield'
                 elif self.world.difficulty_requirements.progressive_shield_limit >= 1:
-                    self.prog_items.append('Blue Shield')
-                    changed = True
+                    self.prog_items['Blue Shield'] += 1
+                    changed = 'Blue Shield'
         elif item.name.startswith('Bottle'):
             if self.bottle_count() < self.world.difficulty_requirements.progressive_bottle_limit:
-                self.prog_items.append(item.name)
-                changed = True
+                self.prog_items[item.name] += 1
+                changed = item.name
         elif event or item.advancement:
-            self.prog_items.append(item.name)
-            changed = True
+            self.prog_items[item.name] += 1
+            changed = item.name
 
-        if changed:
-            self.clear_cached_unreachable()
+        if changed is not None:
+            self.clear_cached_unreachable(changed)
             if not event:
                 self.sweep_for_events()
-                self.clear_cached_unreachable()
 
     def remove(self, item):
         if item.advancement:
@@ -597,16 +986,26 @@ class CollectionState(object):
                         to_remove = None
 
             if to_remove is not None:
-                try:
-                    self.prog_items.remove(to_remove)
-                except ValueError:
+                if not self.prog_items[to_remove]:
                     return
+                self.unshare('prog_items')
+                self.prog_items[to_remove] -= 1
+                if not self.prog_items[to_remove]:
+                    del self.prog_items[to_remove]
 
                 # invalidate caches, nothing can be trusted anymore now
-                self.region_cache = {}
-                self.location_cache = {}
-                self.entrance_cache = {}
-                self.recursion_count = 0
+                self.clear_cached_reachability()
+
+    def clear_cached_reachability(self):
+        # forget everything derived from the inventory, for when items were taken out of the state or the world
+        self.reachable_regions = set()
+        self.blocked_connections = OrderedDict()
+        self.stale = True
+        self.location_cache = {}
+        self.blocked_locations = set()
+        self.unreached_locations = set()
+        self.changed_items = None
+        self.shared.difference_update(['reachable_regions', 'blocked_connections', 'location_cache', 'blocked_locations', 'unreached_locations'])
 
     def __getattr__(self, item):
         if item.startswith('can_reach_'):
@@ -631,8 +1030,11 @@ class RegionType(Enum):
 
 class Region(object):
 
+    __slots__ = ('name', 'id', 'type', 'entrances', 'exits', 'locations', 'dungeon', 'shop', 'world', 'is_light_world', 'is_dark_world', 'spot_type', 'hint_text', 'spawn_rule')
+
     def __init__(self, name, type, hint):
         self.name = name
+        self.id = None
         self.type = type
         self.entrances = []
         self.exits = []
@@ -644,15 +1046,10 @@ class Region(object):
         self.is_dark_world = False
         self.spot_type = 'Region'
         self.hint_text = hint
-        self.recursion_count = 0
+        self.spawn_rule = None  # reachable without passing an entrance if set and fulfilled, e.g. save & quit points
 
     def can_reach(self, state):
-        for entrance in self.entrances:
-            if state.can_reach(entrance):
-                if not self in state.path:
-                    state.path[self] = (self.name, state.path.get(entrance, None))
-                return True
-        return False
+        return state.can_reach(self)
 
     def can_fill(self, item):
         is_dungeon_item = item.key or item.map or item.compass
@@ -671,20 +1068,23 @@ class Region(object):
 
 class Entrance(object):
 
+    __slots__ = ('name', 'id', 'parent_region', 'connected_region', 'target', 'addresses', 'spot_type', 'vanilla', 'access_rule')
+
     def __init__(self, name='', parent=None):
         self.name = name
+        self.id = None
         self.parent_region = parent
         self.connected_region = None
         self.target = None
         self.addresses = None
         self.spot_type = 'Entrance'
-        self.recursion_count = 0
         self.vanilla = None
-        self.access_rule = lambda state: True
+        self.access_rule = AllOf()
 
     def can_reach(self, state):
         if self.access_rule(state) and state.can_reach(self.parent_region):
             if not self in state.path:
+                state.unshare('path')
                 state.path[self] = (self.name, state.path.get(self.parent_region, (self.parent_region.name, None)))
             return True
 
@@ -708,10 +1108,12 @@ class Dungeon(object):
 
     def __init__(self, name, regions, big_key, small_keys, dungeon_items):
         self.name = name
+        self.id = None
         self.regions = regions
         self.big_key = big_key
         self.small_keys = small_keys
         self.dungeon_items = dungeon_items
+        self.item_names = frozenset(item.name for item in self.all_items)
         self.bosses = dict()
 
     @property
@@ -731,7 +1133,7 @@ class Dungeon(object):
         return self.dungeon_items + self.keys
 
     def is_dungeon_item(self, item):
-        return item.name in [dungeon_item.name for dungeon_item in self.all_items]
+        return item.name in self.item_names
 
     def __str__(self):
         return str(self.__unicode__())
@@ -748,21 +1150,231 @@ class Boss(object):
     def can_defeat(self, state):
         return self.defeat_rule(state)
 
+class Requirement(object):
+    # declarative building block for access rules, Rules.compile_rules flattens these into one function per spot
+    # requirements can be combined with & and |, plain callables taking a state are accepted as opaque clauses
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __rand__(self, other):
+        return AllOf(other, self)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __ror__(self, other):
+        return AnyOf(other, self)
+
+    def items(self, world):
+        # names of the items the requirement depends on, None if it depends on more than the inventory
+        return None
+
+def rule_items(rule, world):
+    rule = getattr(rule, 'requirement', rule)
+    if isinstance(rule, Requirement):
+        return rule.items(world)
+    return None
+
+def rule_clauses(rule, world, limit=64):
+    # the rule as a list of alternatives, each a list of (item, count) pairs that all have to be met. None if the rule
+    # depends on more than the inventory or would need more than limit alternatives
+    rule = getattr(rule, 'requirement', rule)
+    if isinstance(rule, Has):
+        if rule.items(world) is None:
+            return None
+        return [[(rule.item, rule.count)]]
+    if isinstance(rule, AllOf):
+        clauses = [[]]
+        for requirement in rule.requirements:
+            options = rule_clauses(requirement, world, limit)
+            if options is None:
+                return None
+            clauses = [clause + option for clause in clauses for option in options]
+            if len(clauses) > limit:
+                return None
+        return clauses
+    if isinstance(rule, AnyOf):
+        clauses = []
+        for requirement in rule.requirements:
+            options = rule_clauses(requirement, world, limit)
+            if options is None:
+                return None
+            clauses.extend(options)
+            if len(clauses) > limit:
+                return None
+        return clauses
+    return None
+
+class Has(Requirement):
+    def __init__(self, item, count=1):
+        self.item = item
+        self.count = count
+
+    def __call__(self, state):
+        return state.has(self.item, self.count)
+
+    def items(self, world):
+        return {self.item}
+
+    def __repr__(self):
+        return 'Has(%r, %r)' % (self.item, self.count)
+
+class HasKey(Has):
+    def __call__(self, state):
+        return state.has_key(self.item, self.count)
+
+    def items(self, world):
+        # retro keys are bought in shops, so these depend on reachability
+        return None if world.retro else {self.item}
+
+    def __repr__(self):
+        return 'HasKey(%r, %r)' % (self.item, self.count)
+
+class CanReach(Requirement):
+    def __init__(self, spot, resolution_hint=None):
+        self.spot = spot
+        self.resolution_hint = resolution_hint
+
+    def __call__(self, state):
+        return state.can_reach(self.spot, self.resolution_hint)
+
+    def __repr__(self):
+        return 'CanReach(%r, %r)' % (self.spot, self.resolution_hint)
+
+class DefeatBoss(Requirement):
+    # the boss is looked up through the dungeon when evaluated as bosses may be shuffled after the rules are set
+    def __init__(self, spot, position=None):
+        self.spot = spot
+        self.position = position
+
+    def __call__(self, state):
+        dungeon = self.spot.parent_region.dungeon
+        boss = dungeon.boss if self.position is None else dungeon.bosses[self.position]
+        return boss.can_defeat(state)
+
+    def __repr__(self):
+        return 'DefeatBoss(%r, %r)' % (self.spot.name, self.position)
+
+class AllOf(Requirement):
+    def __init__(self, *requirements):
+        self.requirements = []
+        for requirement in requirements:
+            requirement = getattr(requirement, 'requirement', requirement)
+            if isinstance(requirement, AllOf):
+                self.requirements.extend(requirement.requirements)
+            else:
+                self.requirements.append(requirement)
+
+    def __call__(self, state):
+        return all(requirement(state) for requirement in self.requirements)
+
+    def items(self, world):
+        items = set()
+        for requirement in self.requirements:
+            requirement_items = rule_items(requirement, world)
+            if requirement_items is None:
+                return None
+            items |= requirement_items
+        return items
+
+    def __repr__(self):
+        return 'AllOf(%s)' % ', '.join(repr(requirement) for requirement in self.requirements)
+
+class AnyOf(Requirement):
+    def __init__(self, *requirements):
+        self.requirements = []
+        for requirement in requirements:
+            requirement = getattr(requirement, 'requirement', requirement)
+            if isinstance(requirement, AnyOf):
+                self.requirements.extend(requirement.requirements)
+            else:
+                self.requirements.append(requirement)
+
+    def __call__(self, state):
+        return any(requirement(state) for requirement in self.requirements)
+
+    def items(self, world):
+        items = set()
+        for requirement in self.requirements:
+            requirement_items = rule_items(requirement, world)
+            if requirement_items is None:
+                return None
+            items |= requirement_items
+        return items
+
+    def __repr__(self):
+        return 'AnyOf(%s)' % ', '.join(repr(requirement) for requirement in self.requirements)
+
+def never_allow(state, item):
+    return False
+
+def allow_any_item(item):
+    return True
+
+class LocationsById(object):
+    # locations kept in id order as they are added and removed, so the lists handed out never need sorting
+
+    __slots__ = ('ids', 'locations')
+
+    def __init__(self):
+        self.ids = []
+        self.locations = []
+
+    def add(self, location):
+        index = bisect_left(self.ids, location.id)
+        if index == len(self.ids) or self.ids[index] != location.id:
+            self.ids.insert(index, location.id)
+            self.locations.insert(index, location)
+
+    def discard(self, location):
+        index = bisect_left(self.ids, location.id)
+        if index < len(self.ids) and self.ids[index] == location.id:
+            del self.ids[index]
+            del self.locations[index]
+
+    def __len__(self):
+        return len(self.ids)
+
 class Location(object):
+
+    __slots__ = ('name', 'id', 'parent_region', '_item', 'crystal', 'address', 'spot_type', 'hint_text', 'staleness_count', '_event', 'always_allow', 'access_rule', 'item_rule')
+
     def __init__(self, name='', address=None, crystal=False, hint_text=None, parent=None):
         self.name = name
+        self.id = None
         self.parent_region = parent
-        self.item = None
+        self._item = None
         self.crystal = crystal
         self.address = address
         self.spot_type = 'Location'
         self.hint_text = hint_text if hint_text is not None else 'Hyrule'
-        self.recursion_count = 0
         self.staleness_count = 0
-        self.event = False
-        self.always_allow = lambda item, state: False
-        self.access_rule = lambda state: True
-        self.item_rule = lambda item: True
+        self._event = False
+        self.always_allow = never_allow
+        self.access_rule = AllOf()
+        self.item_rule = allow_any_item
+
+    @property
+    def item(self):
+        return self._item
+
+    @item.setter
+    def item(self, value):
+        previous = self._item
+        self._item = value
+        if previous is not value and self.parent_region is not None and self.parent_region.world is not None:
+            self.parent_region.world.update_location(self, previous)
+
+    @property
+    def event(self):
+        return self._event
+
+    @event.setter
+    def event(self, value):
+        self._event = value
+        if self.parent_region is not None and self.parent_region.world is not None:
+            self.parent_region.world.update_location(self)
 
     def can_fill(self, state, item, check_access=True):
         return self.always_allow(state, item) or (self.parent_region.can_fill(item) and self.item_rule(item) and (not check_access or self.can_reach(state)))
@@ -779,13 +1391,14 @@ class Location(object):
         return '%s' % self.name
 
 
-class Item(object):
+class ItemInfo(object):
+    # static data of an item, shared by all items of the same name
 
-    def __init__(self, name='', advancement=False, priority=False, type=None, code=None, pedestal_hint=None, pedestal_credit=None, sickkid_credit=None, zora_credit=None, witch_credit=None, fluteboy_credit=None, hint_text=None):
-        self.name = name
-        self.advancement = advancement
-        self.priority = priority
+    __slots__ = ('type', 'code', 'pedestal_hint_text', 'pedestal_credit_text', 'sickkid_credit_text', 'zora_credit_text', 'magicshop_credit_text', 'fluteboy_credit_text', 'hint_text')
+
+    def __init__(self, type=None, code=None, pedestal_hint=None, pedestal_credit=None, sickkid_credit=None, zora_credit=None, witch_credit=None, fluteboy_credit=None, hint_text=None):
         self.type = type
+        self.code = code
         self.pedestal_hint_text = pedestal_hint
         self.pedestal_credit_text = pedestal_credit
         self.sickkid_credit_text = sickkid_credit
@@ -793,9 +1406,60 @@ class Item(object):
         self.magicshop_credit_text = witch_credit
         self.fluteboy_credit_text = fluteboy_credit
         self.hint_text = hint_text
-        self.code = code
+
+
+class Item(object):
+
+    __slots__ = ('name', 'advancement', 'priority', 'info', 'location')
+
+    def __init__(self, name='', advancement=False, priority=False, type=None, code=None, pedestal_hint=None, pedestal_credit=None, sickkid_credit=None, zora_credit=None, witch_credit=None, fluteboy_credit=None, hint_text=None, info=None):
+        self.name = name
+        # advancement and priority get changed for single items, e.g. boss hearts or dungeon items in keysanity
+        self.advancement = advancement
+        self.priority = priority
+        self.info = info if info is not None else ItemInfo(type, code, pedestal_hint, pedestal_credit, sickkid_credit, zora_credit, witch_credit, fluteboy_credit, hint_text)
         self.location = None
 
+    def copy(self):
+        # copy of an unplaced item with the same data
+        return Item(self.name, self.advancement, self.priority, info=self.info)
+
+    @property
+    def type(self):
+        return self.info.type
+
+    @property
+    def code(self):
+        return self.info.code
+
+    @property
+    def pedestal_hint_text(self):
+        return self.info.pedestal_hint_text
+
+    @property
+    def pedestal_credit_text(self):
+        return self.info.pedestal_credit_text
+
+    @property
+    def sickkid_credit_text(self):
+        return self.info.sickkid_credit_text
+
+    @property
+    def zora_credit_text(self):
+        return self.info.zora_credit_text
+
+    @property
+    def magicshop_credit_text(self):
+        return self.info.magicshop_credit_text
+
+    @property
+    def fluteboy_credit_text(self):
+        return self.info.fluteboy_credit_text
+
+    @property
+    def hint_text(self):
+        return self.info.hint_text
+
     @property
     def key(self):
         return self.type == 'SmallKey' or self.type == 'BigKey'
@@ -821,7 +1485,7 @@ class Item(object):
 
 # have 6 address that need to be filled
 class Crystal(Item):
-    pass
+    __slots__ = ()
 
 @unique
 class ShopType(Enum):
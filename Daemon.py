@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from EntranceRandomizer import make_parser
+from Main import main, __version__ as ERVersion
+from Regions import region_templates
+
+# the settings a request can give, checked by the command line parser. everything else is fixed to what --jsonout uses
+request_settings = ['logic', 'mode', 'goal', 'difficulty', 'timer', 'progressive', 'algorithm', 'shuffle', 'fastmenu', 'heartbeep', 'heartcolor', 'shufflebosses',
+                    'quickswap', 'disablemusic', 'keysanity', 'retro', 'nodungeonitems', 'beatableonly', 'hints', 'shuffleganon']
+
+
+class RequestParser(argparse.ArgumentParser):
+    # the command line parser, with invalid settings raised as ValueError instead of ending the process
+
+    def error(self, message):
+        raise ValueError(message)
+
+parser = make_parser(RequestParser)
+defaults = vars(parser.parse_args([]))
+
+
+def make_args(request):
+    # command line arguments for a request, raises ValueError for anything --jsonout would not accept
+    if not isinstance(request, dict):
+        raise ValueError('The request needs to be a JSON object.')
+    unknown = [name for name in request if name not in request_settings and name != 'seed']
+    if unknown:
+        raise ValueError('Unknown settings: %s' % ', '.join(sorted(unknown)))
+    argv = ['--jsonout']
+    for name in request_settings:
+        if name not in request:
+            continue
+        value = request[name]
+        if isinstance(defaults[name], bool):
+            # flags are turned on with --name and off with --no-name
+            if type(value) is not bool:
+                raise ValueError('Invalid value %r for %s, choose from true, false' % (value, name))
+            if value != defaults[name]:
+                argv.append(('--%s' if value else '--no-%s') % name)
+        else:
+            if not isinstance(value, str):
+                raise ValueError('Invalid value %r for %s' % (value, name))
+            argv.append('--%s=%s' % (name, value))
+    args = parser.parse_args(argv)
+    seed = request.get('seed')
+    if seed is not None and (type(seed) is not int or not 0 <= seed <= 999999999):
+        raise ValueError('Invalid seed %r' % seed)
+    return args, seed
+
+
+def _init_worker(loglevel):
+    logging.basicConfig(format='%(message)s', level=loglevel)
+    logging.getLogger('').setLevel(loglevel)
+    # build everything kept for the lifetime of the process before the first request comes in
+    region_templates()
+
+def _generate(job):
+    # the exact output of a --jsonout run
+    args, seed = job
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        main(args=args, seed=seed)
+    return output.getvalue()
+
+
+class GenerationServer(object):
+
+    def __init__(self, workers, queue, loglevel):
+        self.pool = multiprocessing.Pool(workers, _init_worker, (loglevel,))
+        # requests being generated or waiting for a worker, any more are turned away
+        self.slots = threading.BoundedSemaphore(workers + queue)
+
+    def generate(self, args, seed):
+        # None if there is no room for another request
+        if not self.slots.acquire(blocking=False):
+            return None
+        try:
+            return self.pool.apply(_generate, ((args, seed),))
+        finally:
+            self.slots.release()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'ALttPEntranceRandomizer/%s' % ERVersion
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self.send_json(404, {'error': 'Unknown path %s' % self.path})
+            return
+        try:
+            args, seed = make_args(json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8') or '{}'))
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        try:
+            payload = self.server.generation.generate(args, seed)
+        except Exception as e:
+            logging.getLogger('').exception('Generation failed.')
+            self.send_json(500, {'error': '%s: %s' % (type(e).__name__, e)})
+            return
+        if payload is None:
+            self.send_json(503, {'error': 'Too many requests, try again later.'})
+            return
+        self.send_body(200, payload.encode('utf-8'))
+
+    def send_json(self, status, data):
+        self.send_body(status, json.dumps(data).encode('utf-8'))
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # unix sockets have no client address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def log_message(self, format, *args):
+        logging.getLogger('').info('%s - %s', self.address_string(), format % args)
+
+
+class TCPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def start():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter, description='Serve --jsonout generation over HTTP from a pool of warm worker processes.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    parser.add_argument('--port', default=8000, type=int, help='Port to listen on.')
+    parser.add_argument('--socket', help='Listen on this unix socket instead of host and port.')
+    parser.add_argument('--workers', default=max(1, multiprocessing.cpu_count() - 1), type=int, help='Number of seeds generated at the same time.')
+    parser.add_argument('--queue', default=16, type=int, help='Number of requests that may wait for a worker, any more are answered with 503.')
+    parser.add_argument('--loglevel', default='info', const='info', nargs='?', choices=['error', 'info', 'warning', 'debug'], help='Select level of logging for output.')
+    args = parser.parse_args()
+
+    loglevel = {'error': logging.ERROR, 'info': logging.INFO, 'warning': logging.WARNING, 'debug': logging.DEBUG}[args.loglevel]
+    logging.basicConfig(format='%(message)s', level=loglevel)
+
+    if args.socket is not None and not hasattr(socketserver, 'UnixStreamServer'):
+        parser.error('Unix sockets are not supported on this platform.')
+
+    # started before the server socket is opened, so the workers do not hold on to it
+    # the workers only pass on errors, their progress messages would interleave
+    generation = GenerationServer(args.workers, args.queue, max(loglevel, logging.ERROR))
+
+    if args.socket is not None:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixServer(args.socket, RequestHandler)
+        address = args.socket
+    else:
+        server = TCPServer((args.host, args.port), RequestHandler)
+        address = 'http://%s:%i' % server.server_address[:2]
+    server.generation = generation
+
+    logging.getLogger('').info('Serving generation requests on %s with %i workers. POST settings as JSON to /generate.', address, args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.generation.close()
+        if args.socket is not None:
+            os.remove(args.socket)
+
+if __name__ == '__main__':
+    # the worker pool needs this when the daemon runs from a frozen executable
+    multiprocessing.freeze_support()
+    start()
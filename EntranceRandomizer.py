@@ -2,12 +2,11 @@
 import argparse
 import os
 import logging
-import random
+import multiprocessing
 import textwrap
 import sys
 
-from Gui import guiMain
-from Main import main
+from Main import main, main_batch, batch_seeds
 from Utils import is_bundled, close_console
 
 
@@ -17,8 +16,9 @@ class ArgumentDefaultsHelpFormatter(argparse.RawTextHelpFormatter):
         return textwrap.dedent(action.help)
 
 
-def start():
-    parser = argparse.ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter)
+def make_parser(parser_class=argparse.ArgumentParser):
+    # the command line options, the generation daemon checks the settings of its requests with these as well
+    parser = parser_class(formatter_class=ArgumentDefaultsHelpFormatter)
     parser.add_argument('--create_spoiler', help='Output a Spoiler File', action='store_true')
     parser.add_argument('--logic', default='noglitches', const='noglitches', nargs='?', choices=['noglitches', 'minorglitches', 'nologic'],
                         help='''\
@@ -156,6 +156,17 @@ def start():
                              --seed given will produce the same 10 (different) roms each
                              time).
                              ''', type=int)
+    parser.add_argument('--workers', default=1, type=int, help='''\
+                             Number of processes generating the seeds of a --count batch
+                             at the same time. The batch is the same for any number.
+                             (default: %(default)s)
+                             ''')
+    parser.add_argument('--playthrough_workers', default=1, type=int, help='''\
+                             Number of processes used to work out which items are
+                             required for the spoiler playthrough. The playthrough
+                             is the same for any number. Needs a platform that can
+                             fork processes. (default: %(default)s)
+                             ''')
     parser.add_argument('--fastmenu', default='normal', const='normal', nargs='?', choices=['normal', 'instant', 'double', 'triple', 'quadruple', 'half'],
                         help='''\
                              Select the rate at which the menu opens and closes.
@@ -206,6 +217,10 @@ def start():
                              sprite that will be extracted.
                              ''')
     parser.add_argument('--suppress_rom', help='Do not create an output rom file.', action='store_true')
+    parser.add_argument('--delta', help='''\
+                             Write a small .erpt patch against the randomizer base rom
+                             instead of a full rom. ApplyDelta.py turns it into the rom.
+                             ''', action='store_true')
     parser.add_argument('--gui', help='Launch the GUI', action='store_true')
     # Deliberately not documented, only useful for vt site integration right now:
     parser.add_argument('--shufflebosses', help=argparse.SUPPRESS, default='none', const='none', nargs='?', choices=['none', 'basic', 'normal', 'chaos'])
@@ -213,6 +228,14 @@ def start():
                             Output .json patch to stdout instead of a patched rom. Used
                             for VT site integration, do not use otherwise.
                             ''')
+    return parser
+
+
+def start():
+    # only imported here, so the parser can be used where tkinter is not available
+    from Gui import guiMain
+
+    parser = make_parser()
     args = parser.parse_args()
 
     if is_bundled() and len(sys.argv) == 1:
@@ -224,6 +247,9 @@ def start():
         guiMain()
         sys.exit(0)
 
+    if args.workers > 1 and args.jsonout:
+        parser.error('--workers cannot be combined with --jsonout, the patches of the workers would mix on stdout.')
+
     # ToDo: Validate files further than mere existance
     if not args.jsonout and not os.path.isfile(args.rom):
         input('Could not find valid base rom for patching at expected path %s. Please run with -h to see help for further information. \nPress Enter to exit.' % args.rom)
@@ -242,12 +268,13 @@ def start():
     if args.gui:
         guiMain(args)
     elif args.count is not None:
-        seed = args.seed
-        for _ in range(args.count):
-            main(seed=seed, args=args)
-            seed = random.randint(0, 999999999)
+        results = main_batch(args, batch_seeds(args.seed, args.count), args.workers)
+        if any(error is not None for _, _, error in results):
+            sys.exit(1)
     else:
         main(seed=args.seed, args=args)
 
 if __name__ == '__main__':
+    # the bundled windows build starts its pool processes from the executable
+    multiprocessing.freeze_support()
     start()
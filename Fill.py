@@ -25,13 +25,16 @@ def distribute_items_cutoff(world, cutoffrate=0.33):
     while itempool and fill_locations:
         candidate_item_to_place = None
         item_to_place = None
+        unlocked = None
         for item in itempool:
             if advancement_placed or (progress_done and (item.advancement or item.priority)):
                 item_to_place = item
                 break
             if item.advancement:
                 candidate_item_to_place = item
-                if world.unlocks_new_location(item):
+                if unlocked is None:
+                    unlocked = world.unlocks_new_locations([candidate for candidate in itempool if candidate.advancement])
+                if unlocked.locations(item):
                     item_to_place = item
                     placed_advancement_items += 1
                     break
@@ -95,13 +98,16 @@ def distribute_items_staleness(world):
     while itempool and fill_locations:
         candidate_item_to_place = None
         item_to_place = None
+        unlocked = None
         for item in itempool:
             if advancement_placed or (progress_done and (item.advancement or item.priority)):
                 item_to_place = item
                 break
             if item.advancement:
                 candidate_item_to_place = item
-                if world.unlocks_new_location(item):
+                if unlocked is None:
+                    unlocked = world.unlocks_new_locations([candidate for candidate in itempool if candidate.advancement])
+                if unlocked.locations(item):
                     item_to_place = item
                     break
 
@@ -159,10 +165,20 @@ def distribute_items_staleness(world):
 
 
 def fill_restrictive(world, base_state, locations, itempool):
+    # items are placed from the end of the pool, so the remaining items are always a prefix of it.
+    # build the states holding every prefix up front, each one only grows the previous one
+    pool_states = [base_state.copy()]
+    for item in itempool:
+        pool_state = pool_states[-1].copy()
+        pool_state.collect(item, True)
+        pool_state.update_reachable_regions()
+        pool_states.append(pool_state)
+
     def sweep_from_pool():
-        new_state = base_state.copy()
-        for item in itempool:
-            new_state.collect(item, True)
+        del pool_states[len(itempool) + 1:]
+        new_state = pool_states[-1].copy()
+        # items got placed since the prefix state was built, so rules looking at placements have to be checked again
+        new_state.clear_cached_indirect()
         new_state.sweep_for_events()
         return new_state
 
@@ -271,10 +287,13 @@ def flood_items(world):
         # need to place a progress item instead of an already placed item, find candidate
         item_to_place = None
         candidate_item_to_place = None
+        unlocked = None
         for item in itempool:
             if item.advancement:
                 candidate_item_to_place = item
-                if world.unlocks_new_location(item):
+                if unlocked is None:
+                    unlocked = world.unlocks_new_locations([candidate for candidate in itempool if candidate.advancement])
+                if unlocked.locations(item):
                     item_to_place = item
                     break
 
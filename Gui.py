@@ -11,7 +11,7 @@ from urllib.request import urlopen
 
 from AdjusterMain import adjust
 from GuiUtils import ToolTips, set_icon, BackgroundTaskProgress
-from Main import main, __version__ as ESVersion
+from Main import main, main_batch, batch_seeds, __version__ as ESVersion
 from Rom import Sprite
 from Utils import is_bundled, local_path, output_path, open_file
 
@@ -255,6 +255,7 @@ def guiMain(args=None):
         guiargs = Namespace
         guiargs.seed = int(seedVar.get()) if seedVar.get() else None
         guiargs.count = int(countVar.get()) if countVar.get() != '1' else None
+        guiargs.playthrough_workers = 1
         guiargs.mode = modeVar.get()
         guiargs.logic = logicVar.get()
         guiargs.goal = goalVar.get()
@@ -268,6 +269,7 @@ def guiMain(args=None):
         guiargs.fastmenu = fastMenuVar.get()
         guiargs.create_spoiler = bool(createSpoilerVar.get())
         guiargs.suppress_rom = bool(suppressRomVar.get())
+        guiargs.delta = False
         guiargs.keysanity = bool(keysanityVar.get())
         guiargs.retro = bool(retroVar.get())
         guiargs.nodungeonitems = bool(dungeonItemsVar.get())
@@ -292,10 +294,9 @@ def guiMain(args=None):
         guiargs.sprite = sprite
         try:
             if guiargs.count is not None:
-                seed = guiargs.seed
-                for _ in range(guiargs.count):
-                    main(seed=seed, args=guiargs)
-                    seed = random.randint(0, 999999999)
+                failed = [(seed, error) for seed, _, error in main_batch(guiargs, batch_seeds(guiargs.seed, guiargs.count)) if error is not None]
+                if failed:
+                    raise RuntimeError('\n'.join('Seed %s: %s' % (seed, error) for seed, error in failed))
             else:
                 main(seed=guiargs.seed, args=guiargs)
         except Exception as e:
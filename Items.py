@@ -1,6 +1,6 @@
 import logging
 
-from BaseClasses import Item
+from BaseClasses import Item, ItemInfo
 
 
 def ItemFactory(items):
@@ -11,8 +11,8 @@ def ItemFactory(items):
         singleton = True
     for item in items:
         if item in item_table:
-            advancement, priority, type, code, pedestal_hint, pedestal_credit, sickkid_credit, zora_credit, witch_credit, fluteboy_credit, hint_text = item_table[item]
-            ret.append(Item(item, advancement, priority, type, code, pedestal_hint, pedestal_credit, sickkid_credit, zora_credit, witch_credit, fluteboy_credit, hint_text))
+            advancement, priority = item_table[item][:2]
+            ret.append(Item(item, advancement, priority, info=item_info[item]))
         else:
             logging.getLogger('').warning('Unknown Item: %s', item)
             return None
@@ -172,3 +172,6 @@ item_table = {'Bow': (True, False, None, 0x0B, 'You have\nchosen the\narcher cla
               'Pick Up Purple Chest': (True, False, 'Event', None, None, None, None, None, None, None, None),
               'Open Floodgate': (True, False, 'Event', None, None, None, None, None, None, None, None),
              }
+
+# static item data is shared between all items of the same name
+item_info = {name: ItemInfo(*data[2:]) for name, data in item_table.items()}
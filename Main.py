@@ -1,12 +1,13 @@
 from collections import OrderedDict
-import copy
 from itertools import zip_longest
+import copy
 import json
 import logging
+import multiprocessing
 import random
 import time
 
-from BaseClasses import World, CollectionState, Item, Region, Location, Shop
+from BaseClasses import World, CollectionState, SphereSearch
 from Regions import create_regions, mark_light_world_regions
 from EntranceShuffle import link_entrances
 from Rom import patch_rom, Sprite, LocalRom, JsonRom
@@ -37,7 +38,7 @@ logic_hash = [134, 166, 181, 191, 228, 89, 188, 200, 5, 157, 217, 139, 180, 198,
 
 
 def main(args, seed=None):
-    start = time.clock()
+    start = time.perf_counter()
 
     # initialize the world
     world = World(args.shuffle, args.logic, args.mode, args.difficulty, args.timer, args.progressive, args.goal, args.algorithm, not args.nodungeonitems, args.beatableonly, args.shuffleganon, args.quickswap, args.fastmenu, args.disablemusic, args.keysanity, args.retro, args.custom, args.customitemarray, args.shufflebosses, args.hints)
@@ -104,7 +105,7 @@ def main(args, seed=None):
 
     logger.info('Calculating playthrough.')
 
-    create_playthrough(world)
+    create_playthrough(world, args.playthrough_workers)
 
     logger.info('Patching ROM.')
 
@@ -126,6 +127,8 @@ def main(args, seed=None):
         patch_rom(world, rom, bytearray(logic_hash), args.heartbeep, args.heartcolor, sprite)
         if args.jsonout:
             print(json.dumps({'patch': rom.patches, 'spoiler': world.spoiler.to_json()}))
+        elif args.delta:
+            rom.write_delta_to_file(output_path('%s.erpt' % outfilebase))
         else:
             rom.write_to_file(args.jsonout or output_path('%s.sfc' % outfilebase))
 
@@ -133,100 +136,148 @@ def main(args, seed=None):
         world.spoiler.to_file(output_path('%s_Spoiler.txt' % outfilebase))
 
     logger.info('Done. Enjoy.')
-    logger.debug('Total Time: %s', time.clock() - start)
+    logger.debug('Total Time: %s', time.perf_counter() - start)
 
     return world
 
+def batch_seeds(seed, count):
+    # seeds of a batch generated with --count. the first one is the given seed and the others are drawn from it,
+    # so the same batch comes out no matter how many workers generate it
+    rng = random.Random(seed)
+    seeds = [int(seed) if seed is not None else rng.randint(0, 999999999)]
+    used = set(seeds)
+    while len(seeds) < count:
+        # no seed twice, their output files would overwrite each other
+        seed = rng.randint(0, 999999999)
+        if seed not in used:
+            seeds.append(seed)
+            used.add(seed)
+    return seeds
+
+def main_batch(args, seeds, workers=1):
+    # generate every seed with the same settings, spread over a pool of processes if workers > 1. a failing seed
+    # does not stop the batch, the result of every seed is logged and returned as (seed, time, error or None)
+    logger = logging.getLogger('')
+    # make sure the output directory exists before several workers try to create it
+    output_path('')
+
+    if workers > 1:
+        # the workers are daemonic and may not start a playthrough pool of their own, the seeds already keep every
+        # process busy
+        args = copy.copy(args)
+        args.playthrough_workers = 1
+        # the workers only pass on warnings and errors, their progress messages would interleave
+        with multiprocessing.Pool(workers, _init_batch_worker, (args, max(logger.getEffectiveLevel(), logging.WARNING))) as pool:
+            results = list(_log_batch(pool.imap(_generate_seed, seeds), len(seeds)))
+    else:
+        _init_batch_worker(args, None)
+        results = list(_log_batch(map(_generate_seed, seeds), len(seeds)))
+
+    failed = [seed for seed, _, error in results if error is not None]
+    logger.info('Generated %i of %i seeds in %.2fs.%s', len(results) - len(failed), len(results), sum(elapsed for _, elapsed, _ in results),
+                ' Failed: %s' % ', '.join(str(seed) for seed in failed) if failed else '')
+    return results
+
+def _log_batch(results, count):
+    for index, (seed, elapsed, error) in enumerate(results):
+        if error is None:
+            logging.getLogger('').info('[%i/%i] Seed %s done in %.2fs.', index + 1, count, seed, elapsed)
+        else:
+            logging.getLogger('').error('[%i/%i] Seed %s failed after %.2fs: %s', index + 1, count, seed, elapsed, error)
+        yield seed, elapsed, error
+
+def _init_batch_worker(args, loglevel):
+    global _batch_args
+    _batch_args = args
+    if loglevel is not None:
+        logging.basicConfig(format='%(message)s', level=loglevel)
+        logging.getLogger('').setLevel(loglevel)
+
+def _generate_seed(seed):
+    start = time.perf_counter()
+    try:
+        main(seed=seed, args=_batch_args)
+    except Exception as e:
+        logging.getLogger('').debug('Seed %s failed.', seed, exc_info=True)
+        return seed, time.perf_counter() - start, '%s: %s' % (type(e).__name__, e)
+    return seed, time.perf_counter() - start, None
+
 def gt_filler(world):
     if world.goal == 'triforcehunt':
         return random.randint(15, 50)
     return random.randint(0, 15)
 
 def copy_world(world):
-    # ToDo: Not good yet
-    ret = World(world.shuffle, world.logic, world.mode, world.difficulty, world.timer, world.progressive, world.goal, world.algorithm, world.place_dungeon_items, world.check_beatable_only, world.shuffle_ganon, world.quickswap, world.fastmenu, world.disable_music, world.keysanity, world.retro, world.custom, world.customitemarray, world.boss_shuffle, world.hints)
-    ret.required_medallions = list(world.required_medallions)
-    ret.swamp_patch_required = world.swamp_patch_required
-    ret.ganon_at_pyramid = world.ganon_at_pyramid
-    ret.treasure_hunt_count = world.treasure_hunt_count
-    ret.treasure_hunt_icon = world.treasure_hunt_icon
-    ret.sewer_light_cone = world.sewer_light_cone
-    ret.light_world_light_cone = world.light_world_light_cone
-    ret.dark_world_light_cone = world.dark_world_light_cone
-    ret.seed = world.seed
-    ret.can_access_trock_eyebridge = world.can_access_trock_eyebridge
-    ret.can_access_trock_front = world.can_access_trock_front
-    ret.can_access_trock_big_chest = world.can_access_trock_big_chest
-    ret.can_access_trock_middle = world.can_access_trock_middle
-    ret.can_take_damage = world.can_take_damage
-    ret.difficulty_requirements = world.difficulty_requirements
-    ret.fix_fake_world = world.fix_fake_world
-    ret.lamps_needed_for_dark_rooms = world.lamps_needed_for_dark_rooms
-    create_regions(ret)
-    create_dungeons(ret)
-
-    copy_dynamic_regions_and_locations(world, ret)
-
-    # copy bosses
-    for dungeon in world.dungeons:
-        for level, boss in dungeon.bosses.items():
-            ret.get_dungeon(dungeon.name).bosses[level] = boss
-
-    for shop in world.shops:
-        copied_shop = ret.get_region(shop.region.name).shop
-        copied_shop.active = shop.active
-        copied_shop.inventory = copy.copy(shop.inventory)
-
-    # connect copied world
-    for region in world.regions:
-        copied_region = ret.get_region(region.name)
-        copied_region.is_light_world = region.is_light_world
-        copied_region.is_dark_world = region.is_dark_world
-        for entrance in region.entrances:
-            ret.get_entrance(entrance.name).connect(copied_region)
-
-    # fill locations
-    for location in world.get_locations():
-        if location.item is not None:
-            item = Item(location.item.name, location.item.advancement, location.item.priority, location.item.type)
-            ret.get_location(location.name).item = item
-            item.location = ret.get_location(location.name)
-        if location.event:
-            ret.get_location(location.name).event = True
-
-    # copy remaining itempool. No item in itempool should have an assigned location
-    for item in world.itempool:
-        ret.itempool.append(Item(item.name, item.advancement, item.priority, item.type))
-
-    # copy progress items in state
-    ret.state.prog_items = list(world.state.prog_items)
-
-    set_rules(ret)
-
-    return ret
-
-def copy_dynamic_regions_and_locations(world, ret):
-    for region in world.dynamic_regions:
-        new_reg = Region(region.name, region.type, region.hint_text)
-        ret.regions.append(new_reg)
-        ret.dynamic_regions.append(new_reg)
-
-        # Note: ideally exits should be copied here, but the current use case (Take anys) do not require this
-
-        if region.shop:
-            new_reg.shop = Shop(new_reg, region.shop.room_id, region.shop.type, region.shop.shopkeeper_config, region.shop.replaceable)
-            ret.shops.append(new_reg.shop)
-
-    for location in world.dynamic_locations:
-        new_loc = Location(location.name, location.address, location.crystal, location.hint_text, location.parent_region)
-        new_reg = ret.get_region(location.parent_region.name)
-        new_reg.locations.append(new_loc)
-
-
-def create_playthrough(world):
+    return world.clone()
+
+def cull_spheres(world, spheres, collection_spheres):
+    for num, sphere in reversed(list(enumerate(collection_spheres))):
+        to_delete = []
+        for location in sphere:
+            # we remove the item at location and check if game is still beatable
+            logging.getLogger('').debug('Checking if %s is required to beat the game.', location.item.name)
+            old_item = location.item
+            location.item = None
+            # everything before this sphere is still in place, so there is no need to start over
+            if world.can_beat_game(spheres.checkpoint(num)):
+                to_delete.append(location)
+            else:
+                # still required, got to keep it around
+                location.item = old_item
+
+        # cull entries in spheres for spoiler walkthrough at end
+        for location in to_delete:
+            sphere.remove(location)
+
+def cull_spheres_parallel(world, spheres, collection_spheres, workers):
+    # same result as cull_spheres, but the checks are spread over forked copies of the world. every check is done
+    # against the items culled so far, so a batch is only taken up to its first culled item, the checks after it
+    # are repeated with that item gone as well. how much faster this is depends on how many items of a seed are culled
+    culled = []
+    with multiprocessing.get_context('fork').Pool(workers, _init_cull_worker, (world, spheres)) as pool:
+        for num, sphere in reversed(list(enumerate(collection_spheres))):
+            to_delete = []
+            pending = list(sphere)
+            while pending:
+                batch = pending[:workers]
+                for location in batch:
+                    logging.getLogger('').debug('Checking if %s is required to beat the game.', location.item.name)
+                results = pool.map(_check_cull, [(num, culled, location.name) for location in batch])
+                for location, beatable in zip(batch, results):
+                    pending.remove(location)
+                    if beatable:
+                        location.item = None
+                        culled.append(location.name)
+                        to_delete.append(location)
+                        break
+
+            # cull entries in spheres for spoiler walkthrough at end
+            for location in to_delete:
+                sphere.remove(location)
+
+_cull_world = None
+
+def _init_cull_worker(world, spheres):
+    global _cull_world
+    _cull_world = (world, spheres)
+
+def _check_cull(job):
+    num, culled, name = job
+    world, spheres = _cull_world
+    locations = [world.get_location(location) for location in culled + [name]]
+    items = [location.item for location in locations]
+    for location in locations:
+        location.item = None
+    try:
+        return world.can_beat_game(spheres.checkpoint(num))
+    finally:
+        for location, item in zip(locations, items):
+            location.item = item
+
+def create_playthrough(world, workers=1):
     # create a copy as we will modify it
     old_world = world
-    world = copy_world(world)
+    world = world.clone()
 
     # in treasure hunt and pedestal goals, ganon is invincible
     if world.goal in ['pedestal', 'triforcehunt']:
@@ -238,56 +289,29 @@ def create_playthrough(world):
 
     # get locations containing progress items
     prog_locations = [location for location in world.get_filled_locations() if location.item.advancement]
-    state_cache = [None]
     collection_spheres = []
-    state = CollectionState(world)
-    sphere_candidates = list(prog_locations)
+    spheres = SphereSearch(CollectionState(world), prog_locations, sweep_keys=not world.keysanity)
     logging.getLogger('').debug('Building up collection spheres.')
-    while sphere_candidates:
-        if not world.keysanity:
-            state.sweep_for_events(key_only=True)
-
-        sphere = []
+    while spheres.candidates:
         # build up spheres of collection radius. Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-        for location in sphere_candidates:
-            if state.can_reach(location):
-                sphere.append(location)
-
-        for location in sphere:
-            sphere_candidates.remove(location)
-            state.collect(location.item, True, location)
-
+        sphere = spheres.next_sphere()
         collection_spheres.append(sphere)
 
-        state_cache.append(state.copy())
-
         logging.getLogger('').debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres), len(sphere), len(prog_locations))
         if not sphere:
-            logging.getLogger('').debug('The following items could not be reached: %s', ['%s at %s' % (location.item.name, location.name) for location in sphere_candidates])
+            logging.getLogger('').debug('The following items could not be reached: %s', ['%s at %s' % (location.item.name, location.name) for location in spheres.candidates])
             if not world.check_beatable_only:
                 raise RuntimeError('Not all progression items reachable. Something went terribly wrong here.')
             else:
                 break
 
     # in the second phase, we cull each sphere such that the game is still beatable, reducing each range of influence to the bare minimum required inside it
-    for num, sphere in reversed(list(enumerate(collection_spheres))):
-        to_delete = []
-        for location in sphere:
-            # we remove the item at location and check if game is still beatable
-            logging.getLogger('').debug('Checking if %s is required to beat the game.', location.item.name)
-            old_item = location.item
-            location.item = None
-            state.remove(old_item)
-            ##if world.can_beat_game(state_cache[num]):
-            if world.can_beat_game():
-                to_delete.append(location)
-            else:
-                # still required, got to keep it around
-                location.item = old_item
-
-        # cull entries in spheres for spoiler walkthrough at end
-        for location in to_delete:
-            sphere.remove(location)
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        cull_spheres_parallel(world, spheres, collection_spheres, workers)
+    else:
+        if workers > 1:
+            logging.getLogger('').warning('Processes cannot be forked on this platform, the playthrough is worked out by a single process.')
+        cull_spheres(world, spheres, collection_spheres)
 
     # we are now down to just the required progress items in collection_spheres. Unfortunately
     # the previous pruning stage could potentially have made certain items dependant on others
@@ -296,21 +320,14 @@ def create_playthrough(world):
     # to build up the correct spheres
 
     required_locations = [item for sphere in collection_spheres for item in sphere]
-    state = CollectionState(world)
+    spheres = SphereSearch(CollectionState(world), required_locations, sweep_keys=not world.keysanity)
+    state = spheres.state
     collection_spheres = []
-    while required_locations:
-        if not world.keysanity:
-            state.sweep_for_events(key_only=True)
-
-        sphere = list(filter(state.can_reach, required_locations))
-
-        for location in sphere:
-            required_locations.remove(location)
-            state.collect(location.item, True, location)
-
+    while spheres.candidates:
+        sphere = spheres.next_sphere()
         collection_spheres.append(sphere)
 
-        logging.getLogger('').debug('Calculated final sphere %i, containing %i of %i progress items.', len(collection_spheres), len(sphere), len(required_locations))
+        logging.getLogger('').debug('Calculated final sphere %i, containing %i of %i progress items.', len(collection_spheres), len(sphere), len(spheres.candidates))
         if not sphere:
             raise RuntimeError('Not all required items reachable. Something went terribly wrong here.')
 
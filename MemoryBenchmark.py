@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+
+from Main import main
+
+
+def object_size(obj):
+    # shallow size of an object including its attribute dict, if it has one
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+def measure(args, seed):
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    world = main(args=args, seed=seed)
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - baseline
+
+    items = [location.item for location in world.get_locations() if location.item is not None] + world.itempool
+    groups = [('Region', world.regions),
+              ('Entrance', world.get_entrances()),
+              ('Location', world.get_locations()),
+              ('Item', items)]
+    print('Seed %s: %i KiB for the generated world' % (world.seed, total // 1024))
+    for name, objects in groups:
+        print('    %-8s %5i objects, %6i KiB shallow' % (name, len(objects), sum(object_size(obj) for obj in objects) // 1024))
+    return world, total
+
+def start():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter, description='Report the memory held by generated worlds.')
+    parser.add_argument('--logic', default='noglitches', choices=['noglitches', 'minorglitches', 'nologic'])
+    parser.add_argument('--mode', default='open', choices=['standard', 'open', 'swordless'])
+    parser.add_argument('--goal', default='ganon', choices=['ganon', 'pedestal', 'dungeons', 'triforcehunt', 'crystals'])
+    parser.add_argument('--algorithm', default='balanced', choices=['freshness', 'flood', 'vt21', 'vt22', 'vt25', 'vt26', 'balanced'])
+    parser.add_argument('--shuffle', default='full', choices=['vanilla', 'simple', 'restricted', 'full', 'crossed', 'insanity', 'restricted_legacy', 'full_legacy', 'madness_legacy', 'insanity_legacy', 'dungeonsfull', 'dungeonssimple'])
+    parser.add_argument('--keysanity', action='store_true')
+    parser.add_argument('--retro', action='store_true')
+    parser.add_argument('--seed', default=1, type=int, help='Seed of the first world, the following ones count up from it.')
+    parser.add_argument('--count', default=5, type=int, help='Number of worlds to generate and keep alive.')
+    args = parser.parse_args()
+
+    # everything not relevant for the size of the world is left at the generator defaults, no rom is written
+    args.difficulty = 'normal'
+    args.timer = 'none'
+    args.progressive = 'on'
+    args.nodungeonitems = False
+    args.beatableonly = False
+    args.shuffleganon = True
+    args.quickswap = False
+    args.fastmenu = 'normal'
+    args.disablemusic = False
+    args.custom = False
+    args.customitemarray = False
+    args.shufflebosses = 'none'
+    args.hints = False
+    args.playthrough_workers = 1
+    args.create_spoiler = False
+    args.suppress_rom = True
+    args.delta = False
+    args.jsonout = False
+    args.sprite = None
+
+    # keep the generator's own progress messages out of the report
+    logging.basicConfig(format='%(message)s', level=logging.ERROR)
+
+    tracemalloc.start()
+    # the worlds are kept alive like in a batch worker, so every measurement only covers its own world
+    worlds = []
+    sizes = []
+    for seed in range(args.seed, args.seed + args.count):
+        world, size = measure(args, seed)
+        worlds.append(world)
+        sizes.append(size)
+    print('Average: %i KiB per world, %i KiB for all %i worlds' % (sum(sizes) // len(sizes) // 1024, sum(sizes) // 1024, len(sizes)))
+
+if __name__ == '__main__':
+    start()
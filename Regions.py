@@ -2,9 +2,45 @@ import collections
 from BaseClasses import Region, Location, Entrance, RegionType, Shop, ShopType
 
 
+RegionTemplate = collections.namedtuple('RegionTemplate', ['name', 'type', 'hint', 'locations', 'exits'])
+
+_region_templates = None
+
+def region_templates():
+    # the region graph is the same for every world, so it is described only once per process and each world gets
+    # its own copy stamped out from that description
+    global _region_templates
+    if _region_templates is None:
+        _region_templates = tuple(describe_regions())
+    return _region_templates
+
 def create_regions(world):
+    world.regions = [stamp_region(template) for template in region_templates()]
+    world.intialize_regions()
+
+    for region_name, (room_id, shopkeeper, replaceable) in shop_table.items():
+        region = world.get_region(region_name)
+        shop = Shop(region, room_id, ShopType.Shop, shopkeeper, replaceable)
+        region.shop = shop
+        world.shops.append(shop)
+        for index, (item, price) in enumerate(default_shop_contents[region_name]):
+            shop.add_inventory(index, item, price)
+
+    region = world.get_region('Capacity Upgrade')
+    shop = Shop(region, 0x0115, ShopType.UpgradeShop, 0x04, True)
+    region.shop = shop
+    world.shops.append(shop)
+    shop.add_inventory(0, 'Bomb Upgrade (+5)', 100, 7)
+    shop.add_inventory(1, 'Arrow Upgrade (+5)', 100, 7)
 
-    world.regions = [
+def stamp_region(template):
+    ret = Region(template.name, template.type, template.hint)
+    ret.exits = [Entrance(exit, ret) for exit in template.exits]
+    ret.locations = [Location(name, address, crystal, hint_text, ret) for name, address, crystal, hint_text in template.locations]
+    return ret
+
+def describe_regions():
+    return [
         create_lw_region('Light World', ['Mushroom', 'Bottle Merchant', 'Flute Spot', 'Sunken Treasure', 'Purple Chest'],
                          ["Blinds Hideout", "Hyrule Castle Secret Entrance Drop", 'Zoras River', 'Kings Grave Outer Rocks', 'Dam',
                           'Links House', 'Tavern North', 'Chicken House', 'Aginahs Cave', 'Sahasrahlas Hut', 'Kakariko Well Drop', 'Kakariko Well Cave',
@@ -293,22 +329,6 @@ def create_regions(world):
         create_dw_region('Pyramid Ledge', None, ['Pyramid Entrance', 'Pyramid Drop'])
     ]
 
-    for region_name, (room_id, shopkeeper, replaceable) in shop_table.items():
-        region = world.get_region(region_name)
-        shop = Shop(region, room_id, ShopType.Shop, shopkeeper, replaceable)
-        region.shop = shop
-        world.shops.append(shop)
-        for index, (item, price) in enumerate(default_shop_contents[region_name]):
-            shop.add_inventory(index, item, price)
-
-    region = world.get_region('Capacity Upgrade')
-    shop = Shop(region, 0x0115, ShopType.UpgradeShop, 0x04, True)
-    region.shop = shop
-    world.shops.append(shop)
-    shop.add_inventory(0, 'Bomb Upgrade (+5)', 100, 7)
-    shop.add_inventory(1, 'Arrow Upgrade (+5)', 100, 7)
-    world.intialize_regions()
-
 def create_lw_region(name, locations=None, exits=None):
     return _create_region(name, RegionType.LightWorld, 'Light World', locations, exits)
 
@@ -322,18 +342,12 @@ def create_dungeon_region(name, hint='Hyrule', locations=None, exits=None):
     return _create_region(name, RegionType.Dungeon, hint, locations, exits)
 
 def _create_region(name, type, hint='Hyrule', locations=None, exits=None):
-    ret = Region(name, type, hint)
     if locations is None:
         locations = []
     if exits is None:
         exits = []
 
-    for exit in exits:
-        ret.exits.append(Entrance(exit, ret))
-    for location in locations:
-        address, crystal, hint_text = location_table[location]
-        ret.locations.append(Location(location, address, crystal, hint_text, ret))
-    return ret
+    return RegionTemplate(name, type, hint, tuple((location,) + tuple(location_table[location]) for location in locations), tuple(exits))
 
 def mark_light_world_regions(world):
     # cross world caves may have some sections marked as both in_light_world, and in_dark_work.
@@ -5,13 +5,14 @@ import logging
 import os
 import struct
 import random
+import zlib
 
 from BaseClasses import ShopType
 from Dungeons import dungeon_music_addresses
 from Text import MultiByteTextMapper, text_addresses, Credits, TextTable
 from Text import Uncle_texts, Ganon1_texts, TavernMan_texts, Sahasrahla2_texts, Triforce_texts, Blind_texts, BombShop2_texts, junk_texts
 from Text import KingsReturn_texts, Sanctuary_texts, Kakariko_texts, Blacksmiths_texts, DeathMountain_texts, LostWoods_texts, WishingWell_texts, DesertPalace_texts, MountainTower_texts, LinksHouse_texts, Lumberjacks_texts, SickKid_texts, FluteBoy_texts, Zora_texts, MagicShop_texts, Sahasrahla_names
-from Utils import local_path, int16_as_bytes, int32_as_bytes
+from Utils import local_path, cache_path, int16_as_bytes, int32_as_bytes
 from Items import ItemFactory
 
 
@@ -19,18 +20,26 @@ JAP10HASH = '03a63945398191337e896e5771f77173'
 RANDOMIZERBASEHASH = 'cb560220b7b1b8202e92381aee19cd36'
 
 
-class JsonRom(object):
+class PatchRecorder(object):
+    # writes to a rom image, journaled in a mask of all bytes written so far. overlapping and adjacent writes merge
+    # into one extent, the last write to a byte wins
 
-    def __init__(self):
-        self.patches = {}
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.written = bytearray(len(buffer))
 
     def write_byte(self, address, value):
-        self.patches[str(address)] = [value]
+        self.buffer[address] = value
+        self.written[address] = 1
 
     def write_bytes(self, startaddress, values):
         if not values:
             return
-        self.patches[str(startaddress)] = list(values)
+        endaddress = startaddress + len(values)
+        if endaddress > len(self.buffer):
+            raise IndexError('Write of %i bytes at 0x%X is past the end of the rom.' % (len(values), startaddress))
+        self.buffer[startaddress:endaddress] = bytes(values)
+        self.written[startaddress:endaddress] = b'\x01' * len(values)
 
     def write_int16(self, address, value):
         self.write_bytes(address, int16_as_bytes(value))
@@ -38,6 +47,32 @@ class JsonRom(object):
     def write_int32(self, address, value):
         self.write_bytes(address, int32_as_bytes(value))
 
+    def extents(self):
+        # the written bytes as (address, bytes) runs sorted by address
+        start = self.written.find(1)
+        while start != -1:
+            end = self.written.find(0, start)
+            if end == -1:
+                end = len(self.written)
+            yield start, bytes(self.buffer[start:end])
+            start = self.written.find(1, end)
+
+    def apply(self, buffer):
+        # copy everything written so far onto another image
+        for address, data in self.extents():
+            buffer[address:address + len(data)] = data
+        return buffer
+
+
+class JsonRom(PatchRecorder):
+
+    def __init__(self):
+        super(JsonRom, self).__init__(bytearray(2097152))
+
+    @property
+    def patches(self):
+        return {str(address): list(data) for address, data in self.extents()}
+
     def write_to_file(self, file):
         with open(file, 'w') as stream:
             json.dump([self.patches], stream)
@@ -49,31 +84,43 @@ class JsonRom(object):
 
 
 
-class LocalRom(object):
+class LocalRom(PatchRecorder):
 
     def __init__(self, file, patch=True):
         with open(file, 'rb') as stream:
             self.buffer = read_rom(stream)
         if patch:
             self.patch_base_rom()
+        # only the writes made from here on are journaled, not the base patches
+        self.base_hash = RANDOMIZERBASEHASH if patch else hashlib.md5(self.buffer).hexdigest()
+        super(LocalRom, self).__init__(self.buffer)
+        # sum of all bytes for the checksum, kept up to date by every write. the sum of the base is the same for every
+        # seed, so it is only added up once
+        if self.base_hash not in _rom_sums:
+            _rom_sums[self.base_hash] = sum(self.buffer)
+        self.byte_sum = _rom_sums[self.base_hash]
+        self._hash = self.base_hash
 
     def write_byte(self, address, value):
-        self.buffer[address] = value
+        old = self.buffer[address]
+        super(LocalRom, self).write_byte(address, value)
+        self.byte_sum += value - old
+        self._hash = None
 
     def write_bytes(self, startaddress, values):
-        for i, value in enumerate(values):
-            self.write_byte(startaddress + i, value)
-
-    def write_int16(self, address, value):
-        self.write_bytes(address, int16_as_bytes(value))
-
-    def write_int32(self, address, value):
-        self.write_bytes(address, int32_as_bytes(value))
+        old = sum(self.buffer[startaddress:startaddress + len(values)])
+        super(LocalRom, self).write_bytes(startaddress, values)
+        self.byte_sum += sum(values) - old
+        self._hash = None
 
     def write_to_file(self, file):
         with open(file, 'wb') as outfile:
             outfile.write(self.buffer)
 
+    def write_delta_to_file(self, file):
+        # only the bytes written since the base patches, see ApplyDelta.py
+        RomPatch(len(self.buffer), list(self.extents()), self.base_hash, self.get_hash()).write(file)
+
     def patch_base_rom(self):
         # verify correct checksum of baserom
         basemd5 = hashlib.md5()
@@ -81,16 +128,16 @@ class LocalRom(object):
         if JAP10HASH != basemd5.hexdigest():
             logging.getLogger('').warning('Supplied Base Rom does not match known MD5 for JAP(1.0) release. Will try to patch anyway.')
 
-        # extend to 2MB
-        self.buffer.extend(bytearray([0x00] * (2097152 - len(self.buffer))))
+        # the patched base only depends on the supplied rom, so it is patched once and kept in memory and on disk
+        key = '%s_%s' % (basemd5.hexdigest(), RANDOMIZERBASEHASH)
+        if key not in _patched_base_roms:
+            _patched_base_roms[key] = load_patched_base_rom(key)
+        if _patched_base_roms[key] is not None:
+            self.buffer = bytearray(_patched_base_roms[key])
+            return
 
-        # load randomizer patches
-        with open(local_path('data/base2current.json'), 'r') as stream:
-            patches = json.load(stream)
-        for patch in patches:
-            if isinstance(patch, dict):
-                for baseaddress, values in patch.items():
-                    self.write_bytes(int(baseaddress), values)
+        # extend to 2MB and apply the randomizer patches
+        RomPatch.read(local_path('data/base2current.bin')).apply(self.buffer)
 
         # verify md5
         patchedmd5 = hashlib.md5()
@@ -98,15 +145,132 @@ class LocalRom(object):
         if RANDOMIZERBASEHASH != patchedmd5.hexdigest():
             raise RuntimeError('Provided Base Rom unsuitable for patching. Please provide a JAP(1.0) "Zelda no Densetsu - Kamigami no Triforce (Japan).sfc" rom to use as a base.')
 
+        _patched_base_roms[key] = bytes(self.buffer)
+        save_patched_base_rom(key, _patched_base_roms[key])
+
     def write_crc(self):
-        crc = (sum(self.buffer[:0x7FDC] + self.buffer[0x7FE0:]) + 0x01FE) & 0xFFFF
+        # all bytes but the checksum and its complement, which always add up to 0x1FE
+        crc = (self.byte_sum - sum(self.buffer[0x7FDC:0x7FE0]) + 0x01FE) & 0xFFFF
         inv = crc ^ 0xFFFF
         self.write_bytes(0x7FDC, [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF])
 
     def get_hash(self):
-        h = hashlib.md5()
-        h.update(self.buffer)
-        return h.hexdigest()
+        # md5 can not be updated for bytes changed in place, so it is only worked out again after a write
+        if self._hash is None:
+            h = hashlib.md5()
+            h.update(self.buffer)
+            self._hash = h.hexdigest()
+        return self._hash
+
+# sums of all bytes of the roms LocalRom starts from, by their md5
+_rom_sums = {}
+
+# patched base roms by the md5 of the supplied rom and the base patch they were made with, None if not cached yet
+_patched_base_roms = {}
+
+def load_patched_base_rom(key):
+    try:
+        with open(cache_path('base_%s.sfc' % key), 'rb') as stream:
+            buffer = stream.read()
+    except OSError:
+        return None
+    # a damaged or partly written cache file is ignored and made again
+    if hashlib.md5(buffer).hexdigest() != RANDOMIZERBASEHASH:
+        return None
+    return buffer
+
+def save_patched_base_rom(key, buffer):
+    # written under a temporary name first, so other processes never read a partial file
+    try:
+        path = cache_path('base_%s.sfc' % key)
+        with open('%s.%i' % (path, os.getpid()), 'wb') as stream:
+            stream.write(buffer)
+        os.replace('%s.%i' % (path, os.getpid()), path)
+    except OSError as e:
+        logging.getLogger('').debug('Could not cache the patched base rom: %s', e)
+
+class RomPatch(object):
+    # binary patch file: a header with the size of the patched rom, the number of extents, the crc32 of the body and
+    # the md5 of the rom the patch is made for and of the result (zeros if not known), then the body, zlib compressed
+    # if the flag is set. the body is the table of extents sorted by address, an address and a length each, followed
+    # by the bytes of all extents in the same order
+    magic = b'ERPT'
+    version = 1
+    header = struct.Struct('<4sBBIII16s16s')
+    extent = struct.Struct('<II')
+    compressed = 0x01
+
+    def __init__(self, size, extents, source_hash=None, target_hash=None):
+        self.size = size
+        self.extents = extents
+        self.source_hash = source_hash
+        self.target_hash = target_hash
+
+    @classmethod
+    def diff(cls, old, new, gap=8, **kwargs):
+        # the patch turning old into new, old is read as zeros past its end. differences less than gap bytes apart
+        # are joined into one extent, the bytes in between take less space than another extent header
+        old = bytes(old).ljust(len(new), b'\0')
+        new = bytes(new)
+        extents = []
+        start = end = None
+        # whole blocks are compared first, only the differing ones byte by byte
+        for block in range(0, len(new), 256):
+            if old[block:block + 256] == new[block:block + 256]:
+                continue
+            for address in range(block, min(block + 256, len(new))):
+                if old[address] == new[address]:
+                    continue
+                if end is not None and address - end < gap:
+                    end = address + 1
+                    continue
+                if end is not None:
+                    extents.append((start, new[start:end]))
+                start, end = address, address + 1
+        if end is not None:
+            extents.append((start, new[start:end]))
+        return cls(len(new), extents, **kwargs)
+
+    @classmethod
+    def read(cls, file):
+        with open(file, 'rb') as stream:
+            data = stream.read()
+        if len(data) < cls.header.size:
+            raise RuntimeError('%s is not a rom patch.' % file)
+        magic, version, flags, size, count, crc, source_hash, target_hash = cls.header.unpack_from(data)
+        if magic != cls.magic or version != cls.version:
+            raise RuntimeError('%s is not a rom patch of a supported version.' % file)
+        body = data[cls.header.size:]
+        if flags & cls.compressed:
+            body = zlib.decompress(body)
+        if zlib.crc32(body) != crc:
+            raise RuntimeError('%s is damaged, its checksum does not match.' % file)
+
+        table = count * cls.extent.size
+        payload = memoryview(body)[table:]
+        extents = []
+        offset = 0
+        for address, length in cls.extent.iter_unpack(body[:table]):
+            extents.append((address, payload[offset:offset + length]))
+            offset += length
+        empty = bytes(16)
+        return cls(size, extents, source_hash.hex() if source_hash != empty else None, target_hash.hex() if target_hash != empty else None)
+
+    def write(self, file, compress=True):
+        body = b''.join([self.extent.pack(address, len(data)) for address, data in self.extents] + [bytes(data) for _, data in self.extents])
+        header = self.header.pack(self.magic, self.version, self.compressed if compress else 0, self.size, len(self.extents), zlib.crc32(body),
+                                  bytes.fromhex(self.source_hash) if self.source_hash is not None else bytes(16),
+                                  bytes.fromhex(self.target_hash) if self.target_hash is not None else bytes(16))
+        with open(file, 'wb') as stream:
+            stream.write(header + (zlib.compress(body, 9) if compress else body))
+
+    def apply(self, buffer):
+        # patch a bytearray in place, it is padded with zeros to the size of the patched rom first
+        if len(buffer) < self.size:
+            buffer.extend(bytes(self.size - len(buffer)))
+        for address, data in self.extents:
+            buffer[address:address + len(data)] = data
+        return buffer
 
 def read_rom(stream):
     "Reads rom into bytearray and strips off any smc header"
@@ -310,20 +474,16 @@ def patch_rom(world, rom, hashtable, beep='normal', color='red', sprite=None):
         rom.write_byte(0x155C9, random.choice([0x11, 0x16]))  # Randomize GT music too in keysanity mode
 
     # patch entrance/exits/holes
+    exit_rows = {}
     for region in world.regions:
         for exit in region.exits:
             if exit.target is not None:
                 if isinstance(exit.addresses, tuple):
                     offset = exit.target
-                    room_id, ow_area, vram_loc, scroll_y, scroll_x, link_y, link_x, camera_y, camera_x, unknown_1, unknown_2, door_1, door_2 = exit.addresses
+                    row = list(exit.addresses)
+                    room_id, link_y = row[0], row[5]
                     #room id is deliberately not written
 
-
-                    rom.write_byte(0x15B8C + offset, ow_area)
-                    rom.write_int16(0x15BDB + 2 * offset, vram_loc)
-                    rom.write_int16(0x15C79 + 2 * offset, scroll_y)
-                    rom.write_int16(0x15D17 + 2 * offset, scroll_x)
-
                     # for positioning fixups we abuse the roomid as a way of identifying which exit data we are appling
                     # Thanks to Zarby89 for originally finding these values
                     # todo fix screen scrolling
@@ -333,25 +493,17 @@ def patch_rom(world, rom, hashtable, beep='normal', color='red', sprite=None):
                                       'Palace of Darkness Exit', 'Swamp Palace Exit', 'Ganons Tower Exit', 'Desert Palace Exit (North)', 'Agahnims Tower Exit', 'Spiral Cave Exit (Top)',
                                       'Superbunny Cave Exit (Bottom)', 'Turtle Rock Ledge Exit (East)']:
                         # For exits that connot be reached from another, no need to apply offset fixes.
-                        rom.write_int16(0x15DB5 + 2 * offset, link_y) # same as final else
+                        row[5] = link_y # same as final else
                     elif room_id == 0x0059 and world.fix_skullwoods_exit:
-                        rom.write_int16(0x15DB5 + 2 * offset, 0x00F8)
+                        row[5] = 0x00F8
                     elif room_id == 0x004a and world.fix_palaceofdarkness_exit:
-                        rom.write_int16(0x15DB5 + 2 * offset, 0x0640)
+                        row[5] = 0x0640
                     elif room_id == 0x00d6 and world.fix_trock_exit:
-                        rom.write_int16(0x15DB5 + 2 * offset, 0x0134)
+                        row[5] = 0x0134
                     elif room_id == 0x000c and world.fix_gtower_exit: # fix ganons tower exit point
-                        rom.write_int16(0x15DB5 + 2 * offset, 0x00A4)
-                    else:
-                        rom.write_int16(0x15DB5 + 2 * offset, link_y)
-
-                    rom.write_int16(0x15E53 + 2 * offset, link_x)
-                    rom.write_int16(0x15EF1 + 2 * offset, camera_y)
-                    rom.write_int16(0x15F8F + 2 * offset, camera_x)
-                    rom.write_byte(0x1602D + offset, unknown_1)
-                    rom.write_byte(0x1607C + offset, unknown_2)
-                    rom.write_int16(0x160CB + 2 * offset, door_1)
-                    rom.write_int16(0x16169 + 2 * offset, door_2)
+                        row[5] = 0x00A4
+
+                    exit_rows[offset] = row
                 elif isinstance(exit.addresses, list):
                     # is hole
                     for address in exit.addresses:
@@ -359,6 +511,7 @@ def patch_rom(world, rom, hashtable, beep='normal', color='red', sprite=None):
                 else:
                     # patch door table
                     rom.write_byte(0xDBB73 + exit.addresses, exit.target)
+    write_exit_table(rom, exit_rows)
 
     write_custom_shops(rom, world)
 
@@ -848,6 +1001,24 @@ def patch_rom(world, rom, hashtable, beep='normal', color='red', sprite=None):
 
     return rom
 
+# the overworld exit table is a column per field of the door_addresses tuples of EntranceShuffle, indexed by exit id.
+# (field, address of the column, struct format of an entry), the room id in field 0 is not part of the table
+exit_table_columns = [(1, 0x15B8C, 'B'), (2, 0x15BDB, 'H'), (3, 0x15C79, 'H'), (4, 0x15D17, 'H'), (5, 0x15DB5, 'H'), (6, 0x15E53, 'H'),
+                      (7, 0x15EF1, 'H'), (8, 0x15F8F, 'H'), (9, 0x1602D, 'B'), (10, 0x1607C, 'B'), (11, 0x160CB, 'H'), (12, 0x16169, 'H')]
+
+def write_exit_table(rom, rows):
+    # write the exit table rows by exit id, every column is written with one packed write per run of consecutive ids
+    runs = []
+    for offset in sorted(rows):
+        if runs and runs[-1][-1] == offset - 1:
+            runs[-1].append(offset)
+        else:
+            runs.append([offset])
+    for field, address, format in exit_table_columns:
+        size = struct.calcsize(format)
+        for run in runs:
+            rom.write_bytes(address + size * run[0], struct.pack('<%i%s' % (len(run), format), *[rows[offset][field] for offset in run]))
+
 def write_custom_shops(rom, world):
     shops = [shop for shop in world.shops if shop.replaceable and shop.active]
 
@@ -1130,11 +1301,11 @@ def write_strings(rom, world):
     silverarrow_hint = (' %s?' % silverarrows[0].hint_text.replace('Ganon\'s', 'my')) if silverarrows else '?\nI think not!'
     tt['ganon_phase_3'] = 'Did you find the silver arrows%s' % silverarrow_hint
 
-    crystal5 = world.find_items('Crystal 5')[0]
-    crystal6 = world.find_items('Crystal 6')[0]
+    crystal5 = world.find_item('Crystal 5')
+    crystal6 = world.find_item('Crystal 6')
     tt['bomb_shop'] = 'Big Bomb?\nMy supply is blocked until you clear %s and %s.' % (crystal5.hint_text, crystal6.hint_text)
 
-    greenpendant = world.find_items('Green Pendant')[0]
+    greenpendant = world.find_item('Green Pendant')
     tt['sahasrahla_bring_courage'] = 'I lost my family heirloom in %s' % greenpendant.hint_text
 
     tt['uncle_leaving_text'] = Uncle_texts[random.randint(0, len(Uncle_texts) - 1)]
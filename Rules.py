@@ -1,15 +1,17 @@
 import collections
 import logging
+from BaseClasses import Requirement, Has, HasKey, CanReach, DefeatBoss, AllOf, AnyOf
+from Items import item_table
 
 
 def set_rules(world):
 
     if world.logic == 'nologic':
         logging.getLogger('').info('WARNING! Seeds generated under this logic often require major glitches and may be impossible!')
-        world.get_region('Links House').can_reach = lambda state: True
-        world.get_region('Sanctuary').can_reach = lambda state: True
-        old_rule = world.get_region('Old Man House').can_reach
-        world.get_region('Old Man House').can_reach = lambda state: state.can_reach('Old Man', 'Location') or old_rule(state)
+        set_spawn_rule(world.get_region('Links House'), AllOf())
+        set_spawn_rule(world.get_region('Sanctuary'), AllOf())
+        set_spawn_rule(world.get_region('Old Man House'), CanReach('Old Man', 'Location'))
+        compile_rules(world)
         return
 
     global_rules(world)
@@ -32,50 +34,154 @@ def set_rules(world):
 
     if world.goal == 'dungeons':
         # require all dungeons to beat ganon
-        add_rule(world.get_location('Ganon'), lambda state: state.can_reach('Master Sword Pedestal', 'Location') and state.has('Beat Agahnim 1') and state.has('Beat Agahnim 2'))
+        add_rule(world.get_location('Ganon'), CanReach('Master Sword Pedestal', 'Location') & Has('Beat Agahnim 1') & Has('Beat Agahnim 2'))
     elif world.goal == 'ganon':
         # require aga2 to beat ganon
-        add_rule(world.get_location('Ganon'), lambda state: state.has('Beat Agahnim 2'))
+        add_rule(world.get_location('Ganon'), Has('Beat Agahnim 2'))
 
     set_big_bomb_rules(world)
 
     # if swamp and dam have not been moved we require mirror for swamp palace
     if not world.swamp_patch_required:
-        add_rule(world.get_entrance('Swamp Palace Moat'), lambda state: state.has_Mirror())
+        add_rule(world.get_entrance('Swamp Palace Moat'), Has('Magic Mirror'))
 
     set_bunny_rules(world)
 
+    compile_rules(world)
+
 
 def set_rule(spot, rule):
     spot.access_rule = rule
 
 def set_defeat_dungeon_boss_rule(location):
     # Lambda required to defer evaluation of dungeon.boss since it will change later if boos shuffle is used
-    set_rule(location, lambda state: location.parent_region.dungeon.boss.can_defeat(state))
+    set_rule(location, DefeatBoss(location))
+
+def set_spawn_rule(region, rule):
+    region.spawn_rule = rule
+    if region not in region.world.spawn_regions:
+        region.world.spawn_regions.append(region)
 
 def set_always_allow(spot, rule):
     spot.always_allow = rule
 
 def add_rule(spot, rule, combine='and'):
-    old_rule = spot.access_rule
+    # rules are kept as flat requirement lists, compile_rules turns them into a single function per spot
     if combine == 'or':
-        spot.access_rule = lambda state: rule(state) or old_rule(state)
+        spot.access_rule = AnyOf(rule, spot.access_rule)
     else:
-        spot.access_rule = lambda state: rule(state) and old_rule(state)
+        spot.access_rule = AllOf(rule, spot.access_rule)
 
 
 def add_lamp_requirement(spot):
-    add_rule(spot, lambda state: state.has('Lamp', state.world.lamps_needed_for_dark_rooms))
+    add_rule(spot, Has('Lamp', spot.parent_region.world.lamps_needed_for_dark_rooms))
 
 
 def forbid_item(location, item):
     old_rule = location.item_rule
-    location.item_rule = lambda i: i.name != item and old_rule(i)
+    forbidden = getattr(old_rule, 'forbidden_items', frozenset()) | {item}
+    base_rule = getattr(old_rule, 'base_rule', old_rule)
+    rule = lambda i: i.name not in forbidden and base_rule(i)
+    rule.forbidden_items = forbidden
+    rule.base_rule = base_rule
+    location.item_rule = rule
+
+
+def can_lift_rocks():
+    return Has('Power Glove') | Has('Titans Mitts')
+
+def has_sword():
+    return Has('Fighter Sword') | Has('Master Sword') | Has('Tempered Sword') | Has('Golden Sword')
+
+def has_beam_sword():
+    return Has('Master Sword') | Has('Tempered Sword') | Has('Golden Sword')
+
+def has_blunt_weapon():
+    return has_sword() | Has('Hammer')
+
+def has_fire_source():
+    return Has('Fire Rod') | Has('Lamp')
+
+def has_bottle():
+    return AnyOf(*[Has(name) for name in item_table if name.startswith('Bottle')])
+
+def can_shoot_arrows(world):
+    if world.retro:
+        return Has('Bow') & (Has('Silver Arrows') | (lambda state: state.can_buy_unlimited('Single Arrow')))
+    return Has('Bow')
+
+
+_compiled_rules = {}
+
+def compile_rule(rule, world):
+    # turn a requirement tree into a single function evaluating it with all names already resolved
+    requirement = getattr(rule, 'requirement', rule)
+    if not isinstance(requirement, Requirement):
+        return rule
+    constants = {}
+
+    def bind(value):
+        name = 'c%d' % len(constants)
+        constants[name] = value
+        return name
+
+    def expression(requirement):
+        requirement = getattr(requirement, 'requirement', requirement)
+        if isinstance(requirement, HasKey) and world.retro:
+            return "state.can_buy_unlimited('Small Key (Universal)')"
+        if isinstance(requirement, Has):
+            return 'items.get(%r, 0) >= %r' % (requirement.item, requirement.count)
+        if isinstance(requirement, CanReach):
+            spot = requirement.spot
+            if isinstance(spot, str):
+                if requirement.resolution_hint == 'Location':
+                    spot = world.get_location(spot)
+                elif requirement.resolution_hint == 'Entrance':
+                    spot = world.get_entrance(spot)
+                else:
+                    spot = world.get_region(spot)
+            return 'state.can_reach(%s)' % bind(spot)
+        if isinstance(requirement, DefeatBoss):
+            dungeon = bind(requirement.spot.parent_region.dungeon)
+            if requirement.position is None:
+                return '%s.boss.defeat_rule(state)' % dungeon
+            return '%s.bosses[%r].defeat_rule(state)' % (dungeon, requirement.position)
+        if isinstance(requirement, AllOf):
+            if not requirement.requirements:
+                return 'True'
+            return '(%s)' % ' and '.join(expression(clause) for clause in requirement.requirements)
+        if isinstance(requirement, AnyOf):
+            if not requirement.requirements:
+                return 'False'
+            return '(%s)' % ' or '.join(expression(clause) for clause in requirement.requirements)
+        return '%s(state)' % bind(requirement)
+
+    body = expression(requirement)
+    source = 'def rule(state):\n    items = state.prog_items\n    return %s\n' % body
+    try:
+        code = _compiled_rules[source]
+    except KeyError:
+        code = _compiled_rules[source] = compile(source, '<rule>', 'exec')
+    exec(code, constants)
+    function = constants['rule']
+    function.requirement = requirement
+    return function
+
+
+def compile_rules(world):
+    for region in world.regions:
+        if region.spawn_rule is not None:
+            region.spawn_rule = compile_rule(region.spawn_rule, world)
+        for exit in region.exits:
+            exit.access_rule = compile_rule(exit.access_rule, world)
+        for location in region.locations:
+            location.access_rule = compile_rule(location.access_rule, world)
+    world.clear_rule_cache()
 
 
 def item_in_locations(state, item, locations):
-    for location in locations:
-        if item_name(state, location) == item:
+    for location in state.world.find_items(item):
+        if location.name in locations:
             return True
     return False
 
@@ -91,124 +197,123 @@ def global_rules(world):
     world.get_location('Ganon').item_rule = lambda item: item.name == 'Triforce'
 
     # these are default save&quit points and always accessible
-    world.get_region('Links House').can_reach = lambda state: True
-    world.get_region('Sanctuary').can_reach = lambda state: True
+    set_spawn_rule(world.get_region('Links House'), AllOf())
+    set_spawn_rule(world.get_region('Sanctuary'), AllOf())
 
     # we can s&q to the old man house after we rescue him. This may be somewhere completely different if caves are shuffled!
-    old_rule = world.get_region('Old Man House').can_reach
-    world.get_region('Old Man House').can_reach = lambda state: state.can_reach('Old Man', 'Location') or old_rule(state)
+    set_spawn_rule(world.get_region('Old Man House'), CanReach('Old Man', 'Location'))
 
     # overworld requirements
-    set_rule(world.get_entrance('Kings Grave'), lambda state: state.has_Boots())
-    set_rule(world.get_entrance('Kings Grave Outer Rocks'), lambda state: state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Kings Grave Inner Rocks'), lambda state: state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Kings Grave Mirror Spot'), lambda state: state.has_Pearl() and state.has_Mirror())
+    set_rule(world.get_entrance('Kings Grave'), Has('Pegasus Boots'))
+    set_rule(world.get_entrance('Kings Grave Outer Rocks'), Has('Titans Mitts'))
+    set_rule(world.get_entrance('Kings Grave Inner Rocks'), Has('Titans Mitts'))
+    set_rule(world.get_entrance('Kings Grave Mirror Spot'), Has('Moon Pearl') & Has('Magic Mirror'))
     # Caution: If king's grave is releaxed at all to account for reaching it via a two way cave's exit in insanity mode, then the bomb shop logic will need to be updated (that would involve create a small ledge-like Region for it)
-    set_rule(world.get_entrance('Bonk Fairy (Light)'), lambda state: state.has_Boots())
-    set_rule(world.get_location('Sunken Treasure'), lambda state: state.can_reach('Dam'))
-    set_rule(world.get_entrance('Bat Cave Drop Ledge'), lambda state: state.has('Hammer'))
-    set_rule(world.get_entrance('Lumberjack Tree Tree'), lambda state: state.has_Boots() and state.has('Beat Agahnim 1'))
-    set_rule(world.get_entrance('Bonk Rock Cave'), lambda state: state.has_Boots())
-    set_rule(world.get_entrance('Desert Palace Stairs'), lambda state: state.has('Book of Mudora'))
-    set_rule(world.get_entrance('Sanctuary Grave'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('20 Rupee Cave'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('50 Rupee Cave'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('Death Mountain Entrance Rock'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Flute Spot 1'), lambda state: state.has('Ocarina'))
-    set_rule(world.get_entrance('Lake Hylia Central Island Teleporter'), lambda state: state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Dark Desert Teleporter'), lambda state: state.has('Ocarina') and state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('East Hyrule Teleporter'), lambda state: state.has('Hammer') and state.can_lift_rocks() and state.has_Pearl()) # bunny cannot use hammer
-    set_rule(world.get_entrance('South Hyrule Teleporter'), lambda state: state.has('Hammer') and state.can_lift_rocks() and state.has_Pearl()) # bunny cannot use hammer
-    set_rule(world.get_entrance('Kakariko Teleporter'), lambda state: ((state.has('Hammer') and state.can_lift_rocks()) or state.can_lift_heavy_rocks()) and state.has_Pearl()) # bunny cannot lift bushes
-    set_rule(world.get_location('Flute Spot'), lambda state: state.has('Shovel'))
-    set_rule(world.get_location('Dark Blacksmith Ruins'), lambda state: state.has('Return Smith'))
-    set_rule(world.get_location('Purple Chest'), lambda state: state.has('Pick Up Purple Chest'))  # Can S&Q with chest
-
-    set_rule(world.get_location('Zora\'s Ledge'), lambda state: state.has('Flippers'))
-    set_rule(world.get_entrance('Waterfall of Wishing'), lambda state: state.has('Flippers'))  # can be fake flippered into, but is in weird state inside that might prevent you from doing things. Can be improved in future Todo
-    set_rule(world.get_location('Frog'), lambda state: state.can_lift_heavy_rocks()) # will get automatic moon pearl requirement
-    set_rule(world.get_location('Missing Smith'), lambda state: state.has('Get Frog')) # Can S&Q with smith
-    set_rule(world.get_location('Blacksmith'), lambda state: state.has('Return Smith'))
-    set_rule(world.get_location('Magic Bat'), lambda state: state.has('Magic Powder'))
-    set_rule(world.get_location('Sick Kid'), lambda state: state.has_bottle())
-    set_rule(world.get_location('Library'), lambda state: state.has_Boots())
-    set_rule(world.get_location('Potion Shop'), lambda state: state.has('Mushroom'))
-    set_rule(world.get_entrance('Desert Palace Entrance (North) Rocks'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('Desert Ledge Return Rocks'), lambda state: state.can_lift_rocks())  # should we decide to place something that is not a dungeon end up there at some point
-    set_rule(world.get_entrance('Checkerboard Cave'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_location('Master Sword Pedestal'), lambda state: state.has('Red Pendant') and state.has('Blue Pendant') and state.has('Green Pendant'))
-    set_rule(world.get_location('Sahasrahla'), lambda state: state.has('Green Pendant'))
-    set_rule(world.get_entrance('Agahnims Tower'), lambda state: state.has('Cape') or state.has_beam_sword() or state.has('Beat Agahnim 1'))  # barrier gets removed after killing agahnim, relevant for entrance shuffle
-    set_rule(world.get_entrance('Agahnim 1'), lambda state: state.has_sword() and state.has_key('Small Key (Agahnims Tower)', 2))
+    set_rule(world.get_entrance('Bonk Fairy (Light)'), Has('Pegasus Boots'))
+    set_rule(world.get_location('Sunken Treasure'), CanReach('Dam'))
+    set_rule(world.get_entrance('Bat Cave Drop Ledge'), Has('Hammer'))
+    set_rule(world.get_entrance('Lumberjack Tree Tree'), Has('Pegasus Boots') & Has('Beat Agahnim 1'))
+    set_rule(world.get_entrance('Bonk Rock Cave'), Has('Pegasus Boots'))
+    set_rule(world.get_entrance('Desert Palace Stairs'), Has('Book of Mudora'))
+    set_rule(world.get_entrance('Sanctuary Grave'), can_lift_rocks())
+    set_rule(world.get_entrance('20 Rupee Cave'), can_lift_rocks())
+    set_rule(world.get_entrance('50 Rupee Cave'), can_lift_rocks())
+    set_rule(world.get_entrance('Death Mountain Entrance Rock'), can_lift_rocks())
+    set_rule(world.get_entrance('Bumper Cave Entrance Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Flute Spot 1'), Has('Ocarina'))
+    set_rule(world.get_entrance('Lake Hylia Central Island Teleporter'), Has('Titans Mitts'))
+    set_rule(world.get_entrance('Dark Desert Teleporter'), Has('Ocarina') & Has('Titans Mitts'))
+    set_rule(world.get_entrance('East Hyrule Teleporter'), Has('Hammer') & can_lift_rocks() & Has('Moon Pearl')) # bunny cannot use hammer
+    set_rule(world.get_entrance('South Hyrule Teleporter'), Has('Hammer') & can_lift_rocks() & Has('Moon Pearl')) # bunny cannot use hammer
+    set_rule(world.get_entrance('Kakariko Teleporter'), ((Has('Hammer') & can_lift_rocks()) | Has('Titans Mitts')) & Has('Moon Pearl')) # bunny cannot lift bushes
+    set_rule(world.get_location('Flute Spot'), Has('Shovel'))
+    set_rule(world.get_location('Dark Blacksmith Ruins'), Has('Return Smith'))
+    set_rule(world.get_location('Purple Chest'), Has('Pick Up Purple Chest'))  # Can S&Q with chest
+
+    set_rule(world.get_location('Zora\'s Ledge'), Has('Flippers'))
+    set_rule(world.get_entrance('Waterfall of Wishing'), Has('Flippers'))  # can be fake flippered into, but is in weird state inside that might prevent you from doing things. Can be improved in future Todo
+    set_rule(world.get_location('Frog'), Has('Titans Mitts')) # will get automatic moon pearl requirement
+    set_rule(world.get_location('Missing Smith'), Has('Get Frog')) # Can S&Q with smith
+    set_rule(world.get_location('Blacksmith'), Has('Return Smith'))
+    set_rule(world.get_location('Magic Bat'), Has('Magic Powder'))
+    set_rule(world.get_location('Sick Kid'), has_bottle())
+    set_rule(world.get_location('Library'), Has('Pegasus Boots'))
+    set_rule(world.get_location('Potion Shop'), Has('Mushroom'))
+    set_rule(world.get_entrance('Desert Palace Entrance (North) Rocks'), can_lift_rocks())
+    set_rule(world.get_entrance('Desert Ledge Return Rocks'), can_lift_rocks())  # should we decide to place something that is not a dungeon end up there at some point
+    set_rule(world.get_entrance('Checkerboard Cave'), can_lift_rocks())
+    set_rule(world.get_location('Master Sword Pedestal'), Has('Red Pendant') & Has('Blue Pendant') & Has('Green Pendant'))
+    set_rule(world.get_location('Sahasrahla'), Has('Green Pendant'))
+    set_rule(world.get_entrance('Agahnims Tower'), Has('Cape') | has_beam_sword() | Has('Beat Agahnim 1'))  # barrier gets removed after killing agahnim, relevant for entrance shuffle
+    set_rule(world.get_entrance('Agahnim 1'), has_sword() & HasKey('Small Key (Agahnims Tower)', 2))
     set_defeat_dungeon_boss_rule(world.get_location('Agahnim 1'))
-    set_rule(world.get_location('Castle Tower - Dark Maze'), lambda state: state.has_key('Small Key (Agahnims Tower)'))
-    set_rule(world.get_entrance('Top of Pyramid'), lambda state: state.has('Beat Agahnim 1'))
+    set_rule(world.get_location('Castle Tower - Dark Maze'), HasKey('Small Key (Agahnims Tower)'))
+    set_rule(world.get_entrance('Top of Pyramid'), Has('Beat Agahnim 1'))
     set_rule(world.get_entrance('Old Man Cave Exit (West)'), lambda state: False)  # drop cannot be climbed up
-    set_rule(world.get_entrance('Broken Bridge (West)'), lambda state: state.has('Hookshot'))
-    set_rule(world.get_entrance('Broken Bridge (East)'), lambda state: state.has('Hookshot'))
-    set_rule(world.get_entrance('East Death Mountain Teleporter'), lambda state: state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Fairy Ascension Rocks'), lambda state: state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Paradox Cave Push Block Reverse'), lambda state: state.has('Mirror'))  # can erase block
-    set_rule(world.get_entrance('Death Mountain (Top)'), lambda state: state.has('Hammer'))
-    set_rule(world.get_entrance('Turtle Rock Teleporter'), lambda state: state.can_lift_heavy_rocks() and state.has('Hammer'))
-    set_rule(world.get_location('Ether Tablet'), lambda state: state.has('Book of Mudora') and state.has_beam_sword())
-    set_rule(world.get_entrance('East Death Mountain (Top)'), lambda state: state.has('Hammer'))
-
-    set_rule(world.get_location('Catfish'), lambda state: state.can_lift_rocks())
-    set_rule(world.get_entrance('Northeast Dark World Broken Bridge Pass'), lambda state: state.has_Pearl() and (state.can_lift_rocks() or state.has('Hammer') or state.has('Flippers')))
-    set_rule(world.get_entrance('East Dark World Broken Bridge Pass'), lambda state: state.has_Pearl() and (state.can_lift_rocks() or state.has('Hammer')))
-    set_rule(world.get_entrance('South Dark World Bridge'), lambda state: state.has('Hammer') and state.has_Pearl())
-    set_rule(world.get_entrance('Bonk Fairy (Dark)'), lambda state: state.has_Pearl() and state.has_Boots())
-    set_rule(world.get_entrance('West Dark World Gap'), lambda state: state.has_Pearl() and state.has('Hookshot'))
-    set_rule(world.get_entrance('Palace of Darkness'), lambda state: state.has_Pearl()) # kiki needs pearl
-    set_rule(world.get_entrance('Hyrule Castle Ledge Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Hyrule Castle Main Gate'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Dark Lake Hylia Drop (East)'), lambda state: (state.has_Pearl() and state.has('Flippers') or state.has_Mirror()))  # Overworld Bunny Revival
-    set_rule(world.get_location('Bombos Tablet'), lambda state: state.has('Book of Mudora') and state.has_beam_sword() and state.has_Mirror())
-    set_rule(world.get_entrance('Dark Lake Hylia Drop (South)'), lambda state: state.has_Pearl() and state.has('Flippers'))  # ToDo any fake flipper set up?
-    set_rule(world.get_entrance('Dark Lake Hylia Ledge Fairy'), lambda state: state.has_Pearl()) # bomb required
-    set_rule(world.get_entrance('Dark Lake Hylia Ledge Spike Cave'), lambda state: state.can_lift_rocks() and state.has_Pearl())
-    set_rule(world.get_entrance('Dark Lake Hylia Teleporter'), lambda state: state.has_Pearl() and (state.has('Hammer') or state.can_lift_rocks()))  # Fake Flippers
-    set_rule(world.get_entrance('Village of Outcasts Heavy Rock'), lambda state: state.has_Pearl() and state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Hype Cave'), lambda state: state.has_Pearl()) # bomb required
-    set_rule(world.get_entrance('Brewery'), lambda state: state.has_Pearl()) # bomb required
-    set_rule(world.get_entrance('Thieves Town'), lambda state: state.has_Pearl()) # bunny cannot pull
-    set_rule(world.get_entrance('Skull Woods First Section Hole (North)'), lambda state: state.has_Pearl()) # bunny cannot lift bush
-    set_rule(world.get_entrance('Skull Woods Second Section Hole'), lambda state: state.has_Pearl()) # bunny cannot lift bush
-    set_rule(world.get_entrance('Maze Race Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Cave 45 Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('East Dark World Bridge'), lambda state: state.has_Pearl() and state.has('Hammer'))
-    set_rule(world.get_entrance('Lake Hylia Island Mirror Spot'), lambda state: state.has_Pearl() and state.has_Mirror() and state.has('Flippers'))
-    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('East Dark World River Pier'), lambda state: state.has_Pearl() and state.has('Flippers'))  # ToDo any fake flipper set up?
-    set_rule(world.get_entrance('Graveyard Ledge Mirror Spot'), lambda state: state.has_Pearl() and state.has_Mirror())
-    set_rule(world.get_entrance('Bumper Cave Entrance Rock'), lambda state: state.has_Pearl() and state.can_lift_rocks())
-    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Bat Cave Drop Ledge Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Dark World Hammer Peg Cave'), lambda state: state.has_Pearl() and state.has('Hammer'))
-    set_rule(world.get_entrance('Village of Outcasts Eastern Rocks'), lambda state: state.has_Pearl() and state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Peg Area Rocks'), lambda state: state.has_Pearl() and state.can_lift_heavy_rocks())
-    set_rule(world.get_entrance('Village of Outcasts Pegs'), lambda state: state.has_Pearl() and state.has('Hammer'))
-    set_rule(world.get_entrance('Grassy Lawn Pegs'), lambda state: state.has_Pearl() and state.has('Hammer'))
-    set_rule(world.get_entrance('Bumper Cave Exit (Top)'), lambda state: state.has('Cape'))
-    set_rule(world.get_entrance('Bumper Cave Exit (Bottom)'), lambda state: state.has('Cape') or state.has('Hookshot'))
-
-    set_rule(world.get_entrance('Skull Woods Final Section'), lambda state: state.has('Fire Rod') and state.has_Pearl()) # bunny cannot use fire rod
+    set_rule(world.get_entrance('Broken Bridge (West)'), Has('Hookshot'))
+    set_rule(world.get_entrance('Broken Bridge (East)'), Has('Hookshot'))
+    set_rule(world.get_entrance('East Death Mountain Teleporter'), Has('Titans Mitts'))
+    set_rule(world.get_entrance('Fairy Ascension Rocks'), Has('Titans Mitts'))
+    set_rule(world.get_entrance('Paradox Cave Push Block Reverse'), Has('Mirror'))  # can erase block
+    set_rule(world.get_entrance('Death Mountain (Top)'), Has('Hammer'))
+    set_rule(world.get_entrance('Turtle Rock Teleporter'), Has('Titans Mitts') & Has('Hammer'))
+    set_rule(world.get_location('Ether Tablet'), Has('Book of Mudora') & has_beam_sword())
+    set_rule(world.get_entrance('East Death Mountain (Top)'), Has('Hammer'))
+
+    set_rule(world.get_location('Catfish'), can_lift_rocks())
+    set_rule(world.get_entrance('Northeast Dark World Broken Bridge Pass'), Has('Moon Pearl') & (can_lift_rocks() | Has('Hammer') | Has('Flippers')))
+    set_rule(world.get_entrance('East Dark World Broken Bridge Pass'), Has('Moon Pearl') & (can_lift_rocks() | Has('Hammer')))
+    set_rule(world.get_entrance('South Dark World Bridge'), Has('Hammer') & Has('Moon Pearl'))
+    set_rule(world.get_entrance('Bonk Fairy (Dark)'), Has('Moon Pearl') & Has('Pegasus Boots'))
+    set_rule(world.get_entrance('West Dark World Gap'), Has('Moon Pearl') & Has('Hookshot'))
+    set_rule(world.get_entrance('Palace of Darkness'), Has('Moon Pearl')) # kiki needs pearl
+    set_rule(world.get_entrance('Hyrule Castle Ledge Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Hyrule Castle Main Gate'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Dark Lake Hylia Drop (East)'), (Has('Moon Pearl') & Has('Flippers')) | Has('Magic Mirror'))  # Overworld Bunny Revival
+    set_rule(world.get_location('Bombos Tablet'), Has('Book of Mudora') & has_beam_sword() & Has('Magic Mirror'))
+    set_rule(world.get_entrance('Dark Lake Hylia Drop (South)'), Has('Moon Pearl') & Has('Flippers'))  # ToDo any fake flipper set up?
+    set_rule(world.get_entrance('Dark Lake Hylia Ledge Fairy'), Has('Moon Pearl')) # bomb required
+    set_rule(world.get_entrance('Dark Lake Hylia Ledge Spike Cave'), can_lift_rocks() & Has('Moon Pearl'))
+    set_rule(world.get_entrance('Dark Lake Hylia Teleporter'), Has('Moon Pearl') & (Has('Hammer') | can_lift_rocks()))  # Fake Flippers
+    set_rule(world.get_entrance('Village of Outcasts Heavy Rock'), Has('Moon Pearl') & Has('Titans Mitts'))
+    set_rule(world.get_entrance('Hype Cave'), Has('Moon Pearl')) # bomb required
+    set_rule(world.get_entrance('Brewery'), Has('Moon Pearl')) # bomb required
+    set_rule(world.get_entrance('Thieves Town'), Has('Moon Pearl')) # bunny cannot pull
+    set_rule(world.get_entrance('Skull Woods First Section Hole (North)'), Has('Moon Pearl')) # bunny cannot lift bush
+    set_rule(world.get_entrance('Skull Woods Second Section Hole'), Has('Moon Pearl')) # bunny cannot lift bush
+    set_rule(world.get_entrance('Maze Race Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Cave 45 Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('East Dark World Bridge'), Has('Moon Pearl') & Has('Hammer'))
+    set_rule(world.get_entrance('Lake Hylia Island Mirror Spot'), Has('Moon Pearl') & Has('Magic Mirror') & Has('Flippers'))
+    set_rule(world.get_entrance('Lake Hylia Central Island Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('East Dark World River Pier'), Has('Moon Pearl') & Has('Flippers'))  # ToDo any fake flipper set up?
+    set_rule(world.get_entrance('Graveyard Ledge Mirror Spot'), Has('Moon Pearl') & Has('Magic Mirror'))
+    set_rule(world.get_entrance('Bumper Cave Entrance Rock'), Has('Moon Pearl') & can_lift_rocks())
+    set_rule(world.get_entrance('Bumper Cave Ledge Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Bat Cave Drop Ledge Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Dark World Hammer Peg Cave'), Has('Moon Pearl') & Has('Hammer'))
+    set_rule(world.get_entrance('Village of Outcasts Eastern Rocks'), Has('Moon Pearl') & Has('Titans Mitts'))
+    set_rule(world.get_entrance('Peg Area Rocks'), Has('Moon Pearl') & Has('Titans Mitts'))
+    set_rule(world.get_entrance('Village of Outcasts Pegs'), Has('Moon Pearl') & Has('Hammer'))
+    set_rule(world.get_entrance('Grassy Lawn Pegs'), Has('Moon Pearl') & Has('Hammer'))
+    set_rule(world.get_entrance('Bumper Cave Exit (Top)'), Has('Cape'))
+    set_rule(world.get_entrance('Bumper Cave Exit (Bottom)'), Has('Cape') | Has('Hookshot'))
+
+    set_rule(world.get_entrance('Skull Woods Final Section'), Has('Fire Rod') & Has('Moon Pearl')) # bunny cannot use fire rod
     set_rule(world.get_entrance('Misery Mire'), lambda state: state.has_Pearl() and state.has_sword() and state.has_misery_mire_medallion())  # sword required to cast magic (!)
-    set_rule(world.get_entrance('Desert Ledge (Northeast) Mirror Spot'), lambda state: state.has_Mirror())
-
-    set_rule(world.get_entrance('Desert Ledge Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Desert Palace Entrance (North) Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Spectacle Rock Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Hookshot Cave'), lambda state: state.can_lift_rocks() and state.has_Pearl())
-
-    set_rule(world.get_entrance('East Death Mountain (Top) Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Mimic Cave Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Spiral Cave Mirror Spot'), lambda state: state.has_Mirror())
-    set_rule(world.get_entrance('Fairy Ascension Mirror Spot'), lambda state: state.has_Mirror() and state.has_Pearl())  # need to lift flowers
-    set_rule(world.get_entrance('Isolated Ledge Mirror Spot'), lambda state: state.has_Mirror())
+    set_rule(world.get_entrance('Desert Ledge (Northeast) Mirror Spot'), Has('Magic Mirror'))
+
+    set_rule(world.get_entrance('Desert Ledge Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Desert Palace Stairs Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Desert Palace Entrance (North) Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Spectacle Rock Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Hookshot Cave'), can_lift_rocks() & Has('Moon Pearl'))
+
+    set_rule(world.get_entrance('East Death Mountain (Top) Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Mimic Cave Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Spiral Cave Mirror Spot'), Has('Magic Mirror'))
+    set_rule(world.get_entrance('Fairy Ascension Mirror Spot'), Has('Magic Mirror') & Has('Moon Pearl'))  # need to lift flowers
+    set_rule(world.get_entrance('Isolated Ledge Mirror Spot'), Has('Magic Mirror'))
     set_rule(world.get_entrance('Superbunny Cave Exit (Bottom)'), lambda state: False)  # Cannot get to bottom exit from top. Just exists for shuffling
 
     set_rule(world.get_location('Spike Cave'), lambda state:
@@ -219,28 +324,28 @@ def global_rules(world):
                      (state.world.can_take_damage and (state.has_Boots() or state.has_hearts(4))))))
             )
 
-    set_rule(world.get_location('Hookshot Cave - Top Right'), lambda state: state.has('Hookshot'))
-    set_rule(world.get_location('Hookshot Cave - Top Left'), lambda state: state.has('Hookshot'))
-    set_rule(world.get_location('Hookshot Cave - Bottom Right'), lambda state: state.has('Hookshot') or state.has('Pegasus Boots'))
-    set_rule(world.get_location('Hookshot Cave - Bottom Left'), lambda state: state.has('Hookshot'))
-    set_rule(world.get_entrance('Floating Island Mirror Spot'), lambda state: state.has_Mirror())
+    set_rule(world.get_location('Hookshot Cave - Top Right'), Has('Hookshot'))
+    set_rule(world.get_location('Hookshot Cave - Top Left'), Has('Hookshot'))
+    set_rule(world.get_location('Hookshot Cave - Bottom Right'), Has('Hookshot') | Has('Pegasus Boots'))
+    set_rule(world.get_location('Hookshot Cave - Bottom Left'), Has('Hookshot'))
+    set_rule(world.get_entrance('Floating Island Mirror Spot'), Has('Magic Mirror'))
     set_rule(world.get_entrance('Turtle Rock'), lambda state: state.has_Pearl() and state.has_sword() and state.has_turtle_rock_medallion() and state.can_reach('Turtle Rock (Top)', 'Region'))  # sword required to cast magic (!)
-    set_rule(world.get_location('Mimic Cave'), lambda state: state.has('Hammer'))
+    set_rule(world.get_location('Mimic Cave'), Has('Hammer'))
 
-    set_rule(world.get_entrance('Sewers Door'), lambda state: state.has_key('Small Key (Escape)'))
-    set_rule(world.get_entrance('Sewers Back Door'), lambda state: state.has_key('Small Key (Escape)'))
+    set_rule(world.get_entrance('Sewers Door'), HasKey('Small Key (Escape)'))
+    set_rule(world.get_entrance('Sewers Back Door'), HasKey('Small Key (Escape)'))
 
-    set_rule(world.get_location('Eastern Palace - Big Chest'), lambda state: state.has('Big Key (Eastern Palace)'))
-    set_rule(world.get_location('Eastern Palace - Boss'), lambda state: state.can_shoot_arrows() and state.has('Big Key (Eastern Palace)') and world.get_location('Eastern Palace - Boss').parent_region.dungeon.boss.can_defeat(state))
-    set_rule(world.get_location('Eastern Palace - Prize'), lambda state: state.can_shoot_arrows() and state.has('Big Key (Eastern Palace)') and world.get_location('Eastern Palace - Prize').parent_region.dungeon.boss.can_defeat(state))
+    set_rule(world.get_location('Eastern Palace - Big Chest'), Has('Big Key (Eastern Palace)'))
+    set_rule(world.get_location('Eastern Palace - Boss'), can_shoot_arrows(world) & Has('Big Key (Eastern Palace)') & DefeatBoss(world.get_location('Eastern Palace - Boss')))
+    set_rule(world.get_location('Eastern Palace - Prize'), can_shoot_arrows(world) & Has('Big Key (Eastern Palace)') & DefeatBoss(world.get_location('Eastern Palace - Prize')))
     for location in ['Eastern Palace - Boss', 'Eastern Palace - Big Chest']:
         forbid_item(world.get_location(location), 'Big Key (Eastern Palace)')
 
-    set_rule(world.get_location('Desert Palace - Big Chest'), lambda state: state.has('Big Key (Desert Palace)'))
-    set_rule(world.get_location('Desert Palace - Torch'), lambda state: state.has_Boots())
-    set_rule(world.get_entrance('Desert Palace East Wing'), lambda state: state.has_key('Small Key (Desert Palace)'))
-    set_rule(world.get_location('Desert Palace - Prize'), lambda state: state.has_key('Small Key (Desert Palace)') and state.has('Big Key (Desert Palace)') and state.has_fire_source() and world.get_location('Desert Palace - Prize').parent_region.dungeon.boss.can_defeat(state))
-    set_rule(world.get_location('Desert Palace - Boss'), lambda state: state.has_key('Small Key (Desert Palace)') and state.has('Big Key (Desert Palace)') and state.has_fire_source() and world.get_location('Desert Palace - Boss').parent_region.dungeon.boss.can_defeat(state))
+    set_rule(world.get_location('Desert Palace - Big Chest'), Has('Big Key (Desert Palace)'))
+    set_rule(world.get_location('Desert Palace - Torch'), Has('Pegasus Boots'))
+    set_rule(world.get_entrance('Desert Palace East Wing'), HasKey('Small Key (Desert Palace)'))
+    set_rule(world.get_location('Desert Palace - Prize'), HasKey('Small Key (Desert Palace)') & Has('Big Key (Desert Palace)') & has_fire_source() & DefeatBoss(world.get_location('Desert Palace - Prize')))
+    set_rule(world.get_location('Desert Palace - Boss'), HasKey('Small Key (Desert Palace)') & Has('Big Key (Desert Palace)') & has_fire_source() & DefeatBoss(world.get_location('Desert Palace - Boss')))
     for location in ['Desert Palace - Boss', 'Desert Palace - Big Chest']:
         forbid_item(world.get_location(location), 'Big Key (Desert Palace)')
 
@@ -248,9 +353,9 @@ def global_rules(world):
         forbid_item(world.get_location(location), 'Small Key (Desert Palace)')
 
     set_rule(world.get_entrance('Tower of Hera Small Key Door'), lambda state: state.has_key('Small Key (Tower of Hera)') or item_name(state, 'Tower of Hera - Big Key Chest') == 'Small Key (Tower of Hera)')
-    set_rule(world.get_entrance('Tower of Hera Big Key Door'), lambda state: state.has('Big Key (Tower of Hera)'))
-    set_rule(world.get_location('Tower of Hera - Big Chest'), lambda state: state.has('Big Key (Tower of Hera)'))
-    set_rule(world.get_location('Tower of Hera - Big Key Chest'), lambda state: state.has_fire_source())
+    set_rule(world.get_entrance('Tower of Hera Big Key Door'), Has('Big Key (Tower of Hera)'))
+    set_rule(world.get_location('Tower of Hera - Big Chest'), Has('Big Key (Tower of Hera)'))
+    set_rule(world.get_location('Tower of Hera - Big Key Chest'), has_fire_source())
     set_always_allow(world.get_location('Tower of Hera - Big Key Chest'), lambda state, item: item.name == 'Small Key (Tower of Hera)')
     set_defeat_dungeon_boss_rule(world.get_location('Tower of Hera - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Tower of Hera - Prize'))
@@ -259,105 +364,105 @@ def global_rules(world):
 #    for location in ['Tower of Hera - Big Key Chest']:
 #        forbid_item(world.get_location(location), 'Small Key (Tower of Hera)')
 
-    set_rule(world.get_entrance('Swamp Palace Moat'), lambda state: state.has('Flippers') and state.has('Open Floodgate'))
-    add_rule(world.get_location('Sunken Treasure'), lambda state: state.has('Open Floodgate'))
+    set_rule(world.get_entrance('Swamp Palace Moat'), Has('Flippers') & Has('Open Floodgate'))
+    add_rule(world.get_location('Sunken Treasure'), Has('Open Floodgate'))
 
-    set_rule(world.get_entrance('Swamp Palace Small Key Door'), lambda state: state.has_key('Small Key (Swamp Palace)'))
-    set_rule(world.get_entrance('Swamp Palace (Center)'), lambda state: state.has('Hammer'))
+    set_rule(world.get_entrance('Swamp Palace Small Key Door'), HasKey('Small Key (Swamp Palace)'))
+    set_rule(world.get_entrance('Swamp Palace (Center)'), Has('Hammer'))
     set_rule(world.get_location('Swamp Palace - Big Chest'), lambda state: state.has('Big Key (Swamp Palace)') or item_name(state, 'Swamp Palace - Big Chest') == 'Big Key (Swamp Palace)')
     set_always_allow(world.get_location('Swamp Palace - Big Chest'), lambda state, item: item.name == 'Big Key (Swamp Palace)')
-    set_rule(world.get_entrance('Swamp Palace (North)'), lambda state: state.has('Hookshot'))
+    set_rule(world.get_entrance('Swamp Palace (North)'), Has('Hookshot'))
     set_defeat_dungeon_boss_rule(world.get_location('Swamp Palace - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Swamp Palace - Prize'))
     for location in ['Swamp Palace - Entrance']:
         forbid_item(world.get_location(location), 'Big Key (Swamp Palace)')
 
-    set_rule(world.get_entrance('Thieves Town Big Key Door'), lambda state: state.has('Big Key (Thieves Town)'))
-    set_rule(world.get_entrance('Blind Fight'), lambda state: state.has_key('Small Key (Thieves Town)'))
+    set_rule(world.get_entrance('Thieves Town Big Key Door'), Has('Big Key (Thieves Town)'))
+    set_rule(world.get_entrance('Blind Fight'), HasKey('Small Key (Thieves Town)'))
     set_defeat_dungeon_boss_rule(world.get_location('Thieves\' Town - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Thieves\' Town - Prize'))
     set_rule(world.get_location('Thieves\' Town - Big Chest'), lambda state: (state.has_key('Small Key (Thieves Town)') or item_name(state, 'Thieves\' Town - Big Chest') == 'Small Key (Thieves Town)') and state.has('Hammer'))
     set_always_allow(world.get_location('Thieves\' Town - Big Chest'), lambda state, item: item.name == 'Small Key (Thieves Town)' and state.has('Hammer'))
-    set_rule(world.get_location('Thieves\' Town - Attic'), lambda state: state.has_key('Small Key (Thieves Town)'))
+    set_rule(world.get_location('Thieves\' Town - Attic'), HasKey('Small Key (Thieves Town)'))
     for location in ['Thieves\' Town - Attic', 'Thieves\' Town - Big Chest', 'Thieves\' Town - Blind\'s Cell', 'Thieves\' Town - Boss']:
         forbid_item(world.get_location(location), 'Big Key (Thieves Town)')
     for location in ['Thieves\' Town - Attic', 'Thieves\' Town - Boss']:
         forbid_item(world.get_location(location), 'Small Key (Thieves Town)')
 
-    set_rule(world.get_entrance('Skull Woods First Section South Door'), lambda state: state.has_key('Small Key (Skull Woods)'))
-    set_rule(world.get_entrance('Skull Woods First Section (Right) North Door'), lambda state: state.has_key('Small Key (Skull Woods)'))
-    set_rule(world.get_entrance('Skull Woods First Section West Door'), lambda state: state.has_key('Small Key (Skull Woods)', 2))  # ideally would only be one key, but we may have spent thst key already on escaping the right section
-    set_rule(world.get_entrance('Skull Woods First Section (Left) Door to Exit'), lambda state: state.has_key('Small Key (Skull Woods)', 2))
+    set_rule(world.get_entrance('Skull Woods First Section South Door'), HasKey('Small Key (Skull Woods)'))
+    set_rule(world.get_entrance('Skull Woods First Section (Right) North Door'), HasKey('Small Key (Skull Woods)'))
+    set_rule(world.get_entrance('Skull Woods First Section West Door'), HasKey('Small Key (Skull Woods)', 2))  # ideally would only be one key, but we may have spent thst key already on escaping the right section
+    set_rule(world.get_entrance('Skull Woods First Section (Left) Door to Exit'), HasKey('Small Key (Skull Woods)', 2))
     set_rule(world.get_location('Skull Woods - Big Chest'), lambda state: state.has('Big Key (Skull Woods)') or item_name(state, 'Skull Woods - Big Chest') == 'Big Key (Skull Woods)')
     set_always_allow(world.get_location('Skull Woods - Big Chest'), lambda state, item: item.name == 'Big Key (Skull Woods)')
-    set_rule(world.get_entrance('Skull Woods Torch Room'), lambda state: state.has_key('Small Key (Skull Woods)', 3) and state.has('Fire Rod') and state.has_sword())  # sword required for curtain
+    set_rule(world.get_entrance('Skull Woods Torch Room'), HasKey('Small Key (Skull Woods)', 3) & Has('Fire Rod') & has_sword())  # sword required for curtain
     set_defeat_dungeon_boss_rule(world.get_location('Skull Woods - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Skull Woods - Prize'))
     for location in ['Skull Woods - Boss']:
         forbid_item(world.get_location(location), 'Small Key (Skull Woods)')
 
-    set_rule(world.get_entrance('Ice Palace Entrance Room'), lambda state: state.has('Fire Rod') or (state.has('Bombos') and state.has_sword()))
-    set_rule(world.get_location('Ice Palace - Big Chest'), lambda state: state.has('Big Key (Ice Palace)'))
-    set_rule(world.get_entrance('Ice Palace (Kholdstare)'), lambda state: state.can_lift_rocks() and state.has('Hammer') and state.has('Big Key (Ice Palace)') and (state.has_key('Small Key (Ice Palace)', 2) or (state.has('Cane of Somaria') and state.has_key('Small Key (Ice Palace)', 1))))
+    set_rule(world.get_entrance('Ice Palace Entrance Room'), Has('Fire Rod') | (Has('Bombos') & has_sword()))
+    set_rule(world.get_location('Ice Palace - Big Chest'), Has('Big Key (Ice Palace)'))
+    set_rule(world.get_entrance('Ice Palace (Kholdstare)'), can_lift_rocks() & Has('Hammer') & Has('Big Key (Ice Palace)') & (HasKey('Small Key (Ice Palace)', 2) | (Has('Cane of Somaria') & HasKey('Small Key (Ice Palace)', 1))))
     # TODO: investigate change from VT. Changed to hookshot or 2 keys (no checking for big key in specific chests)
     set_rule(world.get_entrance('Ice Palace (East)'), lambda state: (state.has('Hookshot') or (item_in_locations(state, 'Big Key (Ice Palace)', ['Ice Palace - Spike Room', 'Ice Palace - Big Key Chest', 'Ice Palace - Map Chest']) and state.has_key('Small Key (Ice Palace)'))) and (state.world.can_take_damage or state.has('Hookshot') or state.has('Cape') or state.has('Cane of Byrna')))
-    set_rule(world.get_entrance('Ice Palace (East Top)'), lambda state: state.can_lift_rocks() and state.has('Hammer'))
+    set_rule(world.get_entrance('Ice Palace (East Top)'), can_lift_rocks() & Has('Hammer'))
     set_defeat_dungeon_boss_rule(world.get_location('Ice Palace - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Ice Palace - Prize'))
     for location in ['Ice Palace - Big Chest', 'Ice Palace - Boss']:
         forbid_item(world.get_location(location), 'Big Key (Ice Palace)')
 
-    set_rule(world.get_entrance('Misery Mire Entrance Gap'), lambda state: (state.has_Boots() or state.has('Hookshot')) and (state.has_sword() or state.has('Fire Rod') or state.has('Ice Rod') or state.has('Hammer') or state.has('Cane of Somaria') or state.can_shoot_arrows()))  # need to defeat wizzrobes, bombs don't work ...
-    set_rule(world.get_location('Misery Mire - Big Chest'), lambda state: state.has('Big Key (Misery Mire)'))
+    set_rule(world.get_entrance('Misery Mire Entrance Gap'), (Has('Pegasus Boots') | Has('Hookshot')) & (has_sword() | Has('Fire Rod') | Has('Ice Rod') | Has('Hammer') | Has('Cane of Somaria') | can_shoot_arrows(world)))  # need to defeat wizzrobes, bombs don't work ...
+    set_rule(world.get_location('Misery Mire - Big Chest'), Has('Big Key (Misery Mire)'))
     set_rule(world.get_location('Misery Mire - Spike Chest'), lambda state: (state.world.can_take_damage and state.has_hearts(4)) or state.has('Cane of Byrna') or state.has('Cape'))
-    set_rule(world.get_entrance('Misery Mire Big Key Door'), lambda state: state.has('Big Key (Misery Mire)'))
+    set_rule(world.get_entrance('Misery Mire Big Key Door'), Has('Big Key (Misery Mire)'))
     # you can squander the free small key from the pot by opening the south door to the north west switch room, locking you out of accessing a color switch ...
     # big key gives backdoor access to that from the teleporter in the north west
-    set_rule(world.get_location('Misery Mire - Map Chest'), lambda state: state.has_key('Small Key (Misery Mire)', 1) or state.has('Big Key (Misery Mire)'))
+    set_rule(world.get_location('Misery Mire - Map Chest'), HasKey('Small Key (Misery Mire)', 1) | Has('Big Key (Misery Mire)'))
     # in addition, you can open the door to the map room before getting access to a color switch, so this is locked behing 2 small keys or the big key...
-    set_rule(world.get_location('Misery Mire - Main Lobby'), lambda state: state.has_key('Small Key (Misery Mire)', 2) or state.has_key('Big Key (Misery Mire)'))
+    set_rule(world.get_location('Misery Mire - Main Lobby'), HasKey('Small Key (Misery Mire)', 2) | HasKey('Big Key (Misery Mire)'))
     # we can place a small key in the West wing iff it also contains/blocks the Big Key, as we cannot reach and softlock with the basement key door yet
     set_rule(world.get_entrance('Misery Mire (West)'), lambda state: state.has_key('Small Key (Misery Mire)', 2) if ((item_name(state, 'Misery Mire - Compass Chest') in ['Big Key (Misery Mire)']) or
                                                                                                                  (item_name(state, 'Misery Mire - Big Key Chest') in ['Big Key (Misery Mire)'])) else state.has_key('Small Key (Misery Mire)', 3))
-    set_rule(world.get_location('Misery Mire - Compass Chest'), lambda state: state.has_fire_source())
-    set_rule(world.get_location('Misery Mire - Big Key Chest'), lambda state: state.has_fire_source())
-    set_rule(world.get_entrance('Misery Mire (Vitreous)'), lambda state: state.has('Cane of Somaria'))
+    set_rule(world.get_location('Misery Mire - Compass Chest'), has_fire_source())
+    set_rule(world.get_location('Misery Mire - Big Key Chest'), has_fire_source())
+    set_rule(world.get_entrance('Misery Mire (Vitreous)'), Has('Cane of Somaria'))
     set_defeat_dungeon_boss_rule(world.get_location('Misery Mire - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Misery Mire - Prize'))
     for location in ['Misery Mire - Big Chest', 'Misery Mire - Boss']:
         forbid_item(world.get_location(location), 'Big Key (Misery Mire)')
 
-    set_rule(world.get_entrance('Turtle Rock Entrance Gap'), lambda state: state.has('Cane of Somaria'))
-    set_rule(world.get_entrance('Turtle Rock Entrance Gap Reverse'), lambda state: state.has('Cane of Somaria'))
-    set_rule(world.get_location('Turtle Rock - Compass Chest'), lambda state: state.has('Cane of Somaria'))  # We could get here from the middle section without Cane as we don't cross the entrance gap!
-    set_rule(world.get_location('Turtle Rock - Roller Room - Left'), lambda state: state.has('Cane of Somaria') and state.has('Fire Rod'))
-    set_rule(world.get_location('Turtle Rock - Roller Room - Right'), lambda state: state.has('Cane of Somaria') and state.has('Fire Rod'))
-    set_rule(world.get_location('Turtle Rock - Big Chest'), lambda state: state.has('Big Key (Turtle Rock)') and (state.has('Cane of Somaria') or state.has('Hookshot')))
-    set_rule(world.get_entrance('Turtle Rock (Big Chest) (North)'), lambda state: state.has('Cane of Somaria') or state.has('Hookshot'))
-    set_rule(world.get_entrance('Turtle Rock Big Key Door'), lambda state: state.has('Big Key (Turtle Rock)'))
-    set_rule(world.get_entrance('Turtle Rock (Dark Room) (North)'), lambda state: state.has('Cane of Somaria'))
-    set_rule(world.get_entrance('Turtle Rock (Dark Room) (South)'), lambda state: state.has('Cane of Somaria'))
-    set_rule(world.get_location('Turtle Rock - Eye Bridge - Bottom Left'), lambda state: state.has('Cane of Byrna') or state.has('Cape') or state.has('Mirror Shield'))
-    set_rule(world.get_location('Turtle Rock - Eye Bridge - Bottom Right'), lambda state: state.has('Cane of Byrna') or state.has('Cape') or state.has('Mirror Shield'))
-    set_rule(world.get_location('Turtle Rock - Eye Bridge - Top Left'), lambda state: state.has('Cane of Byrna') or state.has('Cape') or state.has('Mirror Shield'))
-    set_rule(world.get_location('Turtle Rock - Eye Bridge - Top Right'), lambda state: state.has('Cane of Byrna') or state.has('Cape') or state.has('Mirror Shield'))
-    set_rule(world.get_entrance('Turtle Rock (Trinexx)'), lambda state: state.has_key('Small Key (Turtle Rock)', 4) and state.has('Big Key (Turtle Rock)') and state.has('Cane of Somaria'))
+    set_rule(world.get_entrance('Turtle Rock Entrance Gap'), Has('Cane of Somaria'))
+    set_rule(world.get_entrance('Turtle Rock Entrance Gap Reverse'), Has('Cane of Somaria'))
+    set_rule(world.get_location('Turtle Rock - Compass Chest'), Has('Cane of Somaria'))  # We could get here from the middle section without Cane as we don't cross the entrance gap!
+    set_rule(world.get_location('Turtle Rock - Roller Room - Left'), Has('Cane of Somaria') & Has('Fire Rod'))
+    set_rule(world.get_location('Turtle Rock - Roller Room - Right'), Has('Cane of Somaria') & Has('Fire Rod'))
+    set_rule(world.get_location('Turtle Rock - Big Chest'), Has('Big Key (Turtle Rock)') & (Has('Cane of Somaria') | Has('Hookshot')))
+    set_rule(world.get_entrance('Turtle Rock (Big Chest) (North)'), Has('Cane of Somaria') | Has('Hookshot'))
+    set_rule(world.get_entrance('Turtle Rock Big Key Door'), Has('Big Key (Turtle Rock)'))
+    set_rule(world.get_entrance('Turtle Rock (Dark Room) (North)'), Has('Cane of Somaria'))
+    set_rule(world.get_entrance('Turtle Rock (Dark Room) (South)'), Has('Cane of Somaria'))
+    set_rule(world.get_location('Turtle Rock - Eye Bridge - Bottom Left'), Has('Cane of Byrna') | Has('Cape') | Has('Mirror Shield'))
+    set_rule(world.get_location('Turtle Rock - Eye Bridge - Bottom Right'), Has('Cane of Byrna') | Has('Cape') | Has('Mirror Shield'))
+    set_rule(world.get_location('Turtle Rock - Eye Bridge - Top Left'), Has('Cane of Byrna') | Has('Cape') | Has('Mirror Shield'))
+    set_rule(world.get_location('Turtle Rock - Eye Bridge - Top Right'), Has('Cane of Byrna') | Has('Cape') | Has('Mirror Shield'))
+    set_rule(world.get_entrance('Turtle Rock (Trinexx)'), HasKey('Small Key (Turtle Rock)', 4) & Has('Big Key (Turtle Rock)') & Has('Cane of Somaria'))
     set_defeat_dungeon_boss_rule(world.get_location('Turtle Rock - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Turtle Rock - Prize'))
 
-    set_rule(world.get_entrance('Palace of Darkness Bonk Wall'), lambda state: state.can_shoot_arrows())
-    set_rule(world.get_entrance('Palace of Darkness Hammer Peg Drop'), lambda state: state.has('Hammer'))
-    set_rule(world.get_entrance('Palace of Darkness Bridge Room'), lambda state: state.has_key('Small Key (Palace of Darkness)', 1))  # If we can reach any other small key door, we already have back door access to this area
-    set_rule(world.get_entrance('Palace of Darkness Big Key Door'), lambda state: state.has_key('Small Key (Palace of Darkness)', 6) and state.has('Big Key (Palace of Darkness)') and state.can_shoot_arrows() and state.has('Hammer'))
-    set_rule(world.get_entrance('Palace of Darkness (North)'), lambda state: state.has_key('Small Key (Palace of Darkness)', 4))
-    set_rule(world.get_location('Palace of Darkness - Big Chest'), lambda state: state.has('Big Key (Palace of Darkness)'))
+    set_rule(world.get_entrance('Palace of Darkness Bonk Wall'), can_shoot_arrows(world))
+    set_rule(world.get_entrance('Palace of Darkness Hammer Peg Drop'), Has('Hammer'))
+    set_rule(world.get_entrance('Palace of Darkness Bridge Room'), HasKey('Small Key (Palace of Darkness)', 1))  # If we can reach any other small key door, we already have back door access to this area
+    set_rule(world.get_entrance('Palace of Darkness Big Key Door'), HasKey('Small Key (Palace of Darkness)', 6) & Has('Big Key (Palace of Darkness)') & can_shoot_arrows(world) & Has('Hammer'))
+    set_rule(world.get_entrance('Palace of Darkness (North)'), HasKey('Small Key (Palace of Darkness)', 4))
+    set_rule(world.get_location('Palace of Darkness - Big Chest'), Has('Big Key (Palace of Darkness)'))
 
     set_rule(world.get_entrance('Palace of Darkness Big Key Chest Staircase'), lambda state: state.has_key('Small Key (Palace of Darkness)', 6)  or (item_name(state, 'Palace of Darkness - Big Key Chest') in ['Small Key (Palace of Darkness)'] and state.has_key('Small Key (Palace of Darkness)', 3)))
     set_always_allow(world.get_location('Palace of Darkness - Big Key Chest'), lambda state, item: item.name == 'Small Key (Palace of Darkness)' and state.has_key('Small Key (Palace of Darkness)', 5))
 
     set_rule(world.get_entrance('Palace of Darkness Spike Statue Room Door'), lambda state: state.has_key('Small Key (Palace of Darkness)', 6) or (item_name(state, 'Palace of Darkness - Harmless Hellway') in ['Small Key (Palace of Darkness)'] and state.has_key('Small Key (Palace of Darkness)', 4)))
     set_always_allow(world.get_location('Palace of Darkness - Harmless Hellway'), lambda state, item: item.name == 'Small Key (Palace of Darkness)' and state.has_key('Small Key (Palace of Darkness)', 5))
-    set_rule(world.get_entrance('Palace of Darkness Maze Door'), lambda state: state.has_key('Small Key (Palace of Darkness)', 6))
+    set_rule(world.get_entrance('Palace of Darkness Maze Door'), HasKey('Small Key (Palace of Darkness)', 6))
     set_defeat_dungeon_boss_rule(world.get_location('Palace of Darkness - Boss'))
     set_defeat_dungeon_boss_rule(world.get_location('Palace of Darkness - Prize'))
 
@@ -365,18 +470,18 @@ def global_rules(world):
     randomizer_room_chests = ['Ganons Tower - Randomizer Room - Top Left', 'Ganons Tower - Randomizer Room - Top Right', 'Ganons Tower - Randomizer Room - Bottom Left', 'Ganons Tower - Randomizer Room - Bottom Right']
     compass_room_chests = ['Ganons Tower - Compass Room - Top Left', 'Ganons Tower - Compass Room - Top Right', 'Ganons Tower - Compass Room - Bottom Left', 'Ganons Tower - Compass Room - Bottom Right']
 
-    set_rule(world.get_location('Ganons Tower - Bob\'s Torch'), lambda state: state.has_Boots())
-    set_rule(world.get_entrance('Ganons Tower (Tile Room)'), lambda state: state.has('Cane of Somaria'))
-    set_rule(world.get_entrance('Ganons Tower (Hookshot Room)'), lambda state: state.has('Hammer'))
+    set_rule(world.get_location('Ganons Tower - Bob\'s Torch'), Has('Pegasus Boots'))
+    set_rule(world.get_entrance('Ganons Tower (Tile Room)'), Has('Cane of Somaria'))
+    set_rule(world.get_entrance('Ganons Tower (Hookshot Room)'), Has('Hammer'))
 
     set_rule(world.get_entrance('Ganons Tower (Map Room)'), lambda state: state.has_key('Small Key (Ganons Tower)', 4) or (item_name(state, 'Ganons Tower - Map Chest') in ['Big Key (Ganons Tower)', 'Small Key (Ganons Tower)'] and state.has_key('Small Key (Ganons Tower)', 3)))
     set_always_allow(world.get_location('Ganons Tower - Map Chest'), lambda state, item: item.name == 'Small Key (Ganons Tower)' and state.has_key('Small Key (Ganons Tower)', 3))
 
     # It is possible to need more than 2 keys to get through this entance if you spend keys elsewhere. We reflect this in the chest requirements.
     # However we need to leave these at the lower values to derive that with 3 keys it is always possible to reach Bob and Ice Armos.
-    set_rule(world.get_entrance('Ganons Tower (Double Switch Room)'), lambda state: state.has_key('Small Key (Ganons Tower)', 2))
+    set_rule(world.get_entrance('Ganons Tower (Double Switch Room)'), HasKey('Small Key (Ganons Tower)', 2))
     # It is possible to need more than 3 keys ....
-    set_rule(world.get_entrance('Ganons Tower (Firesnake Room)'), lambda state: state.has_key('Small Key (Ganons Tower)', 3))
+    set_rule(world.get_entrance('Ganons Tower (Firesnake Room)'), HasKey('Small Key (Ganons Tower)', 3))
 
     #The actual requirements for these rooms to avoid key-lock
     set_rule(world.get_location('Ganons Tower - Firesnake Room'), lambda state: state.has_key('Small Key (Ganons Tower)', 3) or (item_in_locations(state, 'Big Key (Ganons Tower)', randomizer_room_chests) and state.has_key('Small Key (Ganons Tower)', 2)))
@@ -384,24 +489,24 @@ def global_rules(world):
         set_rule(world.get_location(location), lambda state: state.has_key('Small Key (Ganons Tower)', 4) or (item_in_locations(state, 'Big Key (Ganons Tower)', randomizer_room_chests) and state.has_key('Small Key (Ganons Tower)', 3)))
 
     # Once again it is possible to need more than 3 keys...
-    set_rule(world.get_entrance('Ganons Tower (Tile Room) Key Door'), lambda state: state.has_key('Small Key (Ganons Tower)', 3) and state.has('Fire Rod'))
+    set_rule(world.get_entrance('Ganons Tower (Tile Room) Key Door'), HasKey('Small Key (Ganons Tower)', 3) & Has('Fire Rod'))
     # Actual requirements
     for location in compass_room_chests:
         set_rule(world.get_location(location), lambda state: state.has('Fire Rod') and (state.has_key('Small Key (Ganons Tower)', 4) or (item_in_locations(state, 'Big Key (Ganons Tower)', compass_room_chests) and state.has_key('Small Key (Ganons Tower)', 3))))
 
-    set_rule(world.get_location('Ganons Tower - Big Chest'), lambda state: state.has('Big Key (Ganons Tower)'))
+    set_rule(world.get_location('Ganons Tower - Big Chest'), Has('Big Key (Ganons Tower)'))
 
-    set_rule(world.get_location('Ganons Tower - Big Key Room - Left'), lambda state: world.get_location('Ganons Tower - Big Key Room - Left').parent_region.dungeon.bosses['bottom'].can_defeat(state))
-    set_rule(world.get_location('Ganons Tower - Big Key Chest'), lambda state: world.get_location('Ganons Tower - Big Key Chest').parent_region.dungeon.bosses['bottom'].can_defeat(state))
-    set_rule(world.get_location('Ganons Tower - Big Key Room - Right'), lambda state: world.get_location('Ganons Tower - Big Key Room - Right').parent_region.dungeon.bosses['bottom'].can_defeat(state))
+    set_rule(world.get_location('Ganons Tower - Big Key Room - Left'), DefeatBoss(world.get_location('Ganons Tower - Big Key Room - Left'), 'bottom'))
+    set_rule(world.get_location('Ganons Tower - Big Key Chest'), DefeatBoss(world.get_location('Ganons Tower - Big Key Chest'), 'bottom'))
+    set_rule(world.get_location('Ganons Tower - Big Key Room - Right'), DefeatBoss(world.get_location('Ganons Tower - Big Key Room - Right'), 'bottom'))
 
-    set_rule(world.get_entrance('Ganons Tower Big Key Door'), lambda state: state.has('Big Key (Ganons Tower)') and state.can_shoot_arrows())
-    set_rule(world.get_entrance('Ganons Tower Torch Rooms'), lambda state: state.has_fire_source() and world.get_entrance('Ganons Tower Torch Rooms').parent_region.dungeon.bosses['middle'].can_defeat(state))
-    set_rule(world.get_location('Ganons Tower - Pre-Moldorm Chest'), lambda state: state.has_key('Small Key (Ganons Tower)', 3))
-    set_rule(world.get_entrance('Ganons Tower Moldorm Door'), lambda state: state.has_key('Small Key (Ganons Tower)', 4))
-    set_rule(world.get_entrance('Ganons Tower Moldorm Gap'), lambda state: state.has('Hookshot') and world.get_entrance('Ganons Tower Moldorm Gap').parent_region.dungeon.bosses['top'].can_defeat(state))
+    set_rule(world.get_entrance('Ganons Tower Big Key Door'), Has('Big Key (Ganons Tower)') & can_shoot_arrows(world))
+    set_rule(world.get_entrance('Ganons Tower Torch Rooms'), has_fire_source() & DefeatBoss(world.get_entrance('Ganons Tower Torch Rooms'), 'middle'))
+    set_rule(world.get_location('Ganons Tower - Pre-Moldorm Chest'), HasKey('Small Key (Ganons Tower)', 3))
+    set_rule(world.get_entrance('Ganons Tower Moldorm Door'), HasKey('Small Key (Ganons Tower)', 4))
+    set_rule(world.get_entrance('Ganons Tower Moldorm Gap'), Has('Hookshot') & DefeatBoss(world.get_entrance('Ganons Tower Moldorm Gap'), 'top'))
     set_defeat_dungeon_boss_rule(world.get_location('Agahnim 2'))
-    set_rule(world.get_entrance('Pyramid Hole'), lambda state: state.has('Beat Agahnim 2'))
+    set_rule(world.get_entrance('Pyramid Hole'), Has('Beat Agahnim 2'))
     for location in ['Ganons Tower - Big Chest', 'Ganons Tower - Mini Helmasaur Room - Left', 'Ganons Tower - Mini Helmasaur Room - Right',
                      'Ganons Tower - Pre-Moldorm Chest', 'Ganons Tower - Validation Chest']:
         forbid_item(world.get_location(location), 'Big Key (Ganons Tower)')
@@ -409,27 +514,27 @@ def global_rules(world):
     set_rule(world.get_location('Ganon'), lambda state: state.has_beam_sword() and state.has_fire_source() and state.has('Crystal 1') and state.has('Crystal 2')
                                                         and state.has('Crystal 3') and state.has('Crystal 4') and state.has('Crystal 5') and state.has('Crystal 6') and state.has('Crystal 7')
                                                         and (state.has('Tempered Sword') or state.has('Golden Sword') or (state.has('Silver Arrows') and state.can_shoot_arrows()) or state.has('Lamp') or state.can_extend_magic(12)))  # need to light torch a sufficient amount of times
-    set_rule(world.get_entrance('Ganon Drop'), lambda state: state.has_beam_sword())  # need to damage ganon to get tiles to drop
+    set_rule(world.get_entrance('Ganon Drop'), has_beam_sword())  # need to damage ganon to get tiles to drop
 
     set_rule(world.get_entrance('Ganons Tower'), lambda state: False) # This is a safety for the TR function below to not require GT entrance in its key logic.
 
     set_trock_key_rules(world)
 
-    set_rule(world.get_entrance('Ganons Tower'), lambda state: state.has('Crystal 1') and state.has('Crystal 2') and state.has('Crystal 3') and state.has('Crystal 4') and state.has('Crystal 5') and state.has('Crystal 6') and state.has('Crystal 7'))
+    set_rule(world.get_entrance('Ganons Tower'), Has('Crystal 1') & Has('Crystal 2') & Has('Crystal 3') & Has('Crystal 4') & Has('Crystal 5') & Has('Crystal 6') & Has('Crystal 7'))
 
 
 def no_glitches_rules(world):
-    set_rule(world.get_entrance('Zoras River'), lambda state: state.has('Flippers') or state.can_lift_rocks())
-    set_rule(world.get_entrance('Lake Hylia Central Island Pier'), lambda state: state.has('Flippers'))  # can be fake flippered to
-    set_rule(world.get_entrance('Hobo Bridge'), lambda state: state.has('Flippers'))
-    set_rule(world.get_entrance('Dark Lake Hylia Drop (East)'), lambda state: state.has_Pearl() and state.has('Flippers'))
-    set_rule(world.get_entrance('Dark Lake Hylia Teleporter'), lambda state: state.has_Pearl() and state.has('Flippers') and (state.has('Hammer') or state.can_lift_rocks()))
-    set_rule(world.get_entrance('Dark Lake Hylia Ledge Drop'), lambda state: state.has_Pearl() and state.has('Flippers'))
-    add_rule(world.get_entrance('Ganons Tower (Hookshot Room)'), lambda state: state.has('Hookshot') or state.has_Boots())
-    add_rule(world.get_entrance('Ganons Tower (Double Switch Room)'), lambda state: state.has('Hookshot'))
+    set_rule(world.get_entrance('Zoras River'), Has('Flippers') | can_lift_rocks())
+    set_rule(world.get_entrance('Lake Hylia Central Island Pier'), Has('Flippers'))  # can be fake flippered to
+    set_rule(world.get_entrance('Hobo Bridge'), Has('Flippers'))
+    set_rule(world.get_entrance('Dark Lake Hylia Drop (East)'), Has('Moon Pearl') & Has('Flippers'))
+    set_rule(world.get_entrance('Dark Lake Hylia Teleporter'), Has('Moon Pearl') & Has('Flippers') & (Has('Hammer') | can_lift_rocks()))
+    set_rule(world.get_entrance('Dark Lake Hylia Ledge Drop'), Has('Moon Pearl') & Has('Flippers'))
+    add_rule(world.get_entrance('Ganons Tower (Hookshot Room)'), Has('Hookshot') | Has('Pegasus Boots'))
+    add_rule(world.get_entrance('Ganons Tower (Double Switch Room)'), Has('Hookshot'))
     DMs_room_chests = ['Ganons Tower - DMs Room - Top Left', 'Ganons Tower - DMs Room - Top Right', 'Ganons Tower - DMs Room - Bottom Left', 'Ganons Tower - DMs Room - Bottom Right']
     for location in DMs_room_chests:
-        add_rule(world.get_location(location), lambda state: state.has('Hookshot'))
+        add_rule(world.get_location(location), Has('Hookshot'))
     set_rule(world.get_entrance('Paradox Cave Push Block Reverse'), lambda state: False)  # no glitches does not require block override
     set_rule(world.get_entrance('Paradox Cave Bomb Jump'), lambda state: False)
     set_rule(world.get_entrance('Skull Woods First Section Bomb Jump'), lambda state: False)
@@ -483,8 +588,8 @@ def open_rules(world):
     forbid_item(world.get_location('Hyrule Castle - Boomerang Chest'), 'Small Key (Escape)')
     forbid_item(world.get_location('Hyrule Castle - Zelda\'s Chest'), 'Small Key (Escape)')
 
-    set_rule(world.get_location('Hyrule Castle - Boomerang Chest'), lambda state: state.has_key('Small Key (Escape)'))
-    set_rule(world.get_location('Hyrule Castle - Zelda\'s Chest'), lambda state: state.has_key('Small Key (Escape)'))
+    set_rule(world.get_location('Hyrule Castle - Boomerang Chest'), HasKey('Small Key (Escape)'))
+    set_rule(world.get_location('Hyrule Castle - Zelda\'s Chest'), HasKey('Small Key (Escape)'))
 
 
 def swordless_rules(world):
@@ -494,17 +599,17 @@ def swordless_rules(world):
     # can be revisited.
     open_rules(world)
 
-    set_rule(world.get_entrance('Agahnims Tower'), lambda state: state.has('Cape') or state.has('Hammer') or state.has('Beat Agahnim 1'))  # barrier gets removed after killing agahnim, relevant for entrance shuffle
-    set_rule(world.get_entrance('Agahnim 1'), lambda state: (state.has('Hammer') or state.has('Fire Rod') or state.can_shoot_arrows() or state.has('Cane of Somaria')) and state.has_key('Small Key (Agahnims Tower)', 2))
-    set_rule(world.get_location('Ether Tablet'), lambda state: state.has('Book of Mudora') and state.has('Hammer'))
-    set_rule(world.get_location('Bombos Tablet'), lambda state: state.has('Book of Mudora') and state.has('Hammer') and state.has_Mirror())
+    set_rule(world.get_entrance('Agahnims Tower'), Has('Cape') | Has('Hammer') | Has('Beat Agahnim 1'))  # barrier gets removed after killing agahnim, relevant for entrance shuffle
+    set_rule(world.get_entrance('Agahnim 1'), (Has('Hammer') | Has('Fire Rod') | can_shoot_arrows(world) | Has('Cane of Somaria')) & HasKey('Small Key (Agahnims Tower)', 2))
+    set_rule(world.get_location('Ether Tablet'), Has('Book of Mudora') & Has('Hammer'))
+    set_rule(world.get_location('Bombos Tablet'), Has('Book of Mudora') & Has('Hammer') & Has('Magic Mirror'))
     set_rule(world.get_entrance('Misery Mire'), lambda state: state.has_Pearl() and state.has_misery_mire_medallion())  # sword not required to use medallion for opening in swordless (!)
     set_rule(world.get_entrance('Turtle Rock'), lambda state: state.has_Pearl() and state.has_turtle_rock_medallion() and state.can_reach('Turtle Rock (Top)', 'Region'))   # sword not required to use medallion for opening in swordless (!)
-    set_rule(world.get_entrance('Skull Woods Torch Room'), lambda state: state.has_key('Small Key (Skull Woods)', 3) and state.has('Fire Rod'))  # no curtain
-    set_rule(world.get_entrance('Ice Palace Entrance Room'), lambda state: state.has('Fire Rod') or state.has('Bombos')) #in swordless mode bombos pads are present in the relevant parts of ice palace
-    set_rule(world.get_location('Ganon'), lambda state: state.has('Hammer') and state.has_fire_source() and state.has('Silver Arrows') and state.can_shoot_arrows() and state.has('Crystal 1') and state.has('Crystal 2')
-                                                        and state.has('Crystal 3') and state.has('Crystal 4') and state.has('Crystal 5') and state.has('Crystal 6') and state.has('Crystal 7'))
-    set_rule(world.get_entrance('Ganon Drop'), lambda state: state.has('Hammer'))  # need to damage ganon to get tiles to drop
+    set_rule(world.get_entrance('Skull Woods Torch Room'), HasKey('Small Key (Skull Woods)', 3) & Has('Fire Rod'))  # no curtain
+    set_rule(world.get_entrance('Ice Palace Entrance Room'), Has('Fire Rod') | Has('Bombos')) #in swordless mode bombos pads are present in the relevant parts of ice palace
+    set_rule(world.get_location('Ganon'), Has('Hammer') & has_fire_source() & Has('Silver Arrows') & can_shoot_arrows(world) & Has('Crystal 1') & Has('Crystal 2')
+                                          & Has('Crystal 3') & Has('Crystal 4') & Has('Crystal 5') & Has('Crystal 6') & Has('Crystal 7'))
+    set_rule(world.get_entrance('Ganon Drop'), Has('Hammer'))  # need to damage ganon to get tiles to drop
 
 
 def standard_rules(world):
@@ -523,12 +628,13 @@ def standard_rules(world):
 
 def set_trock_key_rules(world):
 
-    all_state = world.get_all_state(True)
-
     # First set all relevant locked doors to impassible.
     for entrance in ['Turtle Rock Dark Room Staircase', 'Turtle Rock (Chain Chomp Room) (North)', 'Turtle Rock (Chain Chomp Room) (South)', 'Turtle Rock Pokey Room']:
         set_rule(world.get_entrance(entrance), lambda state: False)
 
+    # reachability is propagated eagerly, so the state must only be built once the doors are locked
+    all_state = world.get_all_state(True)
+
     # Check if each of the four main regions of the dungoen can be reached. The previous code section prevents key-costing moves within the dungeon.
     can_reach_back = all_state.can_reach(world.get_region('Turtle Rock (Eye Bridge)')) if world.can_access_trock_eyebridge is None else world.can_access_trock_eyebridge
     world.can_access_trock_eyebridge = can_reach_back
@@ -540,12 +646,12 @@ def set_trock_key_rules(world):
     world.can_access_trock_middle = can_reach_middle
 
     # No matter what, the key requirement for going from the middle to the bottom should be three keys.
-    set_rule(world.get_entrance('Turtle Rock Dark Room Staircase'), lambda state: state.has_key('Small Key (Turtle Rock)', 3))
+    set_rule(world.get_entrance('Turtle Rock Dark Room Staircase'), HasKey('Small Key (Turtle Rock)', 3))
 
     # The following represent the most common and most restrictive key rules. These are overwritten later as needed.
-    set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (South)'), lambda state: state.has_key('Small Key (Turtle Rock)', 4))
-    set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (North)'), lambda state: state.has_key('Small Key (Turtle Rock)', 4))
-    set_rule(world.get_entrance('Turtle Rock Pokey Room'), lambda state: state.has_key('Small Key (Turtle Rock)', 4))
+    set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (South)'), HasKey('Small Key (Turtle Rock)', 4))
+    set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (North)'), HasKey('Small Key (Turtle Rock)', 4))
+    set_rule(world.get_entrance('Turtle Rock Pokey Room'), HasKey('Small Key (Turtle Rock)', 4))
 
     # No matter what, the Big Key cannot be in the Big Chest or held by Trinexx.
     non_big_key_locations = ['Turtle Rock - Big Chest', 'Turtle Rock - Boss']
@@ -572,8 +678,8 @@ def set_trock_key_rules(world):
                                   'Turtle Rock - Eye Bridge - Bottom Right', 'Turtle Rock - Eye Bridge - Top Left',
                                   'Turtle Rock - Eye Bridge - Top Right']
     elif can_reach_front:
-        set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (North)'), lambda state: state.has_key('Small Key (Turtle Rock)', 2))
-        set_rule(world.get_entrance('Turtle Rock Pokey Room'), lambda state: state.has_key('Small Key (Turtle Rock)', 1))
+        set_rule(world.get_entrance('Turtle Rock (Chain Chomp Room) (North)'), HasKey('Small Key (Turtle Rock)', 2))
+        set_rule(world.get_entrance('Turtle Rock Pokey Room'), HasKey('Small Key (Turtle Rock)', 1))
         set_rule(world.get_location('Turtle Rock - Big Key Chest'), lambda state: state.has_key('Small Key (Turtle Rock)', tr_big_key_chest_keys_needed(state)))
         set_always_allow(world.get_location('Turtle Rock - Big Key Chest'), lambda state, item: item.name == 'Small Key (Turtle Rock)' and state.has_key('Small Key (Turtle Rock)', 2))
         non_big_key_locations += ['Turtle Rock - Crystaroller Room', 'Turtle Rock - Eye Bridge - Bottom Left',
@@ -725,21 +831,18 @@ def set_big_bomb_rules(world):
                                          'Desert Palace Entrance (South)',
                                          'Checkerboard Cave',]
 
-    set_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.can_reach('East Dark World', 'Region') and state.can_reach('Big Bomb Shop', 'Region') and state.has('Crystal 5') and state.has('Crystal 6'))
+    set_rule(world.get_entrance('Pyramid Fairy'), CanReach('East Dark World', 'Region') & CanReach('Big Bomb Shop', 'Region') & Has('Crystal 5') & Has('Crystal 6'))
 
     #crossing peg bridge starting from the southern dark world
-    def cross_peg_bridge(state):
-        return state.has('Hammer') and state.has_Pearl()
+    cross_peg_bridge = Has('Hammer') & Has('Moon Pearl')
 
     # returning via the eastern and southern teleporters needs the same items, so we use the southern teleporter for out routing.
     # crossing preg bridge already requires hammer so we just add the gloves to the requirement
-    def southern_teleporter(state):
-        return state.can_lift_rocks() and cross_peg_bridge(state)
+    southern_teleporter = can_lift_rocks() & cross_peg_bridge
 
     # the basic routes assume you can reach eastern light world with the bomb.
     # you can then use the southern teleporter, or (if you have beaten Aga1) the hyrule castle gate warp
-    def basic_routes(state):
-        return southern_teleporter(state) or state.can_reach('Top of Pyramid', 'Entrance')
+    basic_routes = southern_teleporter | CanReach('Top of Pyramid', 'Entrance')
 
     # Key for below abbreviations:
     # P = pearl
@@ -752,88 +855,88 @@ def set_big_bomb_rules(world):
         #1. basic routes
         #2. Can reach Eastern dark world some other way, mirror, get bomb, return to mirror spot, walk to pyramid: Needs mirror
         # -> M or BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: basic_routes(state) or state.has_Mirror())
+        add_rule(world.get_entrance('Pyramid Fairy'), basic_routes | Has('Magic Mirror'))
     elif bombshop_entrance.name in LW_walkable_entrances:
         #1. Mirror then basic routes
         # -> M and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has_Mirror() and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Magic Mirror') & basic_routes)
     elif bombshop_entrance.name in Northern_DW_entrances:
         #1. Mirror and basic routes
         #2. Go to south DW and then cross peg bridge: Need Mitts and hammer and moon pearl
         # -> (Mitts and CPB) or (M and BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.can_lift_heavy_rocks() and cross_peg_bridge(state)) or (state.has_Mirror() and basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Titans Mitts') & cross_peg_bridge) | (Has('Magic Mirror') & basic_routes))
     elif bombshop_entrance.name == 'Bumper Cave (Bottom)':
         #1. Mirror and Lift rock and basic_routes
         #2. Mirror and Flute and basic routes (can make difference if accessed via insanity or w/ mirror from connector, and then via hyrule castle gate, because no gloves are needed in that case)
         #3. Go to south DW and then cross peg bridge: Need Mitts and hammer and moon pearl
         # -> (Mitts and CPB) or (((G or Flute) and M) and BR))
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.can_lift_heavy_rocks() and cross_peg_bridge(state)) or (((state.can_lift_rocks() or state.has('Ocarina')) and state.has_Mirror()) and basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Titans Mitts') & cross_peg_bridge) | ((can_lift_rocks() | Has('Ocarina')) & Has('Magic Mirror') & basic_routes))
     elif bombshop_entrance.name in Southern_DW_entrances:
         #1. Mirror and enter via gate: Need mirror and Aga1
         #2. cross peg bridge: Need hammer and moon pearl
         # -> CPB or (M and A)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: cross_peg_bridge(state) or (state.has_Mirror() and state.can_reach('Top of Pyramid', 'Entrance')))
+        add_rule(world.get_entrance('Pyramid Fairy'), cross_peg_bridge | (Has('Magic Mirror') & CanReach('Top of Pyramid', 'Entrance')))
     elif bombshop_entrance.name in Isolated_DW_entrances:
         # 1. mirror then flute then basic routes
         # -> M and Flute and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has_Mirror() and state.has('Ocarina') and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Magic Mirror') & Has('Ocarina') & basic_routes)
     elif bombshop_entrance.name in Isolated_LW_entrances:
         # 1. flute then basic routes
         # Prexisting mirror spot is not permitted, because mirror might have been needed to reach these isolated locations.
         # -> Flute and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has('Ocarina') and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Ocarina') & basic_routes)
     elif bombshop_entrance.name in West_LW_DM_entrances:
         # 1. flute then basic routes or mirror
         # Prexisting mirror spot is permitted, because flute can be used to reach west DM directly.
         # -> Flute and (M or BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has('Ocarina') and (state.has_Mirror() or basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Ocarina') & (Has('Magic Mirror') | basic_routes))
     elif bombshop_entrance.name in East_LW_DM_entrances:
         # 1. flute then basic routes or mirror and hookshot
         # Prexisting mirror spot is permitted, because flute can be used to reach west DM directly and then east DM via Hookshot
         # -> Flute and ((M and Hookshot) or BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has('Ocarina') and ((state.has_Mirror() and state.has('Hookshot')) or basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Ocarina') & ((Has('Magic Mirror') & Has('Hookshot')) | basic_routes))
     elif bombshop_entrance.name == 'Fairy Ascension Cave (Bottom)':
         # Same as East_LW_DM_entrances except navigation without BR requires Mitts
         # -> Flute and ((M and Hookshot and Mitts) or BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has('Ocarina') and ((state.has_Mirror() and state.has('Hookshot') and state.can_lift_heavy_rocks()) or basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Ocarina') & ((Has('Magic Mirror') & Has('Hookshot') & Has('Titans Mitts')) | basic_routes))
     elif bombshop_entrance.name in Castle_ledge_entrances:
         # 1. mirror on pyramid to castle ledge, grab bomb, return through mirror spot: Needs mirror
         # 2. flute then basic routes
         # -> M or (Flute and BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: state.has_Mirror() or (state.has('Ocarina') and basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), Has('Magic Mirror') | (Has('Ocarina') & basic_routes))
     elif bombshop_entrance.name in Desert_mirrorable_ledge_entrances:
         # Cases when you have mire access: Mirror to reach locations, return via mirror spot, move to center of desert, mirror anagin and:
         # 1. Have mire access, Mirror to reach locations, return via mirror spot, move to center of desert, mirror again and then basic routes
         # 2. flute then basic routes
         # -> (Mire access and M) or Flute) and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: ((state.can_reach('Dark Desert', 'Region') and state.has_Mirror()) or state.has('Ocarina')) and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), ((CanReach('Dark Desert', 'Region') & Has('Magic Mirror')) | Has('Ocarina')) & basic_routes)
     elif bombshop_entrance.name == 'Old Man Cave (West)':
         # 1. Lift rock then basic_routes
         # 2. flute then basic_routes
         # -> (Flute or G) and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.has('Ocarina') or state.can_lift_rocks()) and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Ocarina') | can_lift_rocks()) & basic_routes)
     elif bombshop_entrance.name == 'Graveyard Cave':
         # 1. flute then basic routes
         # 2. (has west dark world access) use existing mirror spot (required Pearl), mirror again off ledge
         # -> (Flute or (M and P and West Dark World access) and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.has('Ocarina') or (state.can_reach('West Dark World', 'Region') and state.has_Pearl() and state.has_Mirror())) and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Ocarina') | (CanReach('West Dark World', 'Region') & Has('Moon Pearl') & Has('Magic Mirror'))) & basic_routes)
     elif bombshop_entrance.name in Mirror_from_SDW_entrances:
         # 1. flute then basic routes
         # 2. (has South dark world access) use existing mirror spot, mirror again off ledge
         # -> (Flute or (M and South Dark World access) and BR
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.has('Ocarina') or (state.can_reach('South Dark World', 'Region') and state.has_Mirror())) and basic_routes(state))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Ocarina') | (CanReach('South Dark World', 'Region') & Has('Magic Mirror'))) & basic_routes)
     elif bombshop_entrance.name == 'Dark World Potion Shop':
         # 1. walk down by lifting rock: needs gloves and pearl`
         # 2. walk down by hammering peg: needs hammer and pearl
         # 3. mirror and basic routes
         # -> (P and (H or Gloves)) or (M and BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.has_Pearl() and (state.has('Hammer') or state.can_lift_rocks())) or (state.has_Mirror() and basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Moon Pearl') & (Has('Hammer') | can_lift_rocks())) | (Has('Magic Mirror') & basic_routes))
     elif bombshop_entrance.name == 'Kings Grave':
         # same as the Normal_LW_entrances case except that the pre-existing mirror is only possible if you have mitts
         # (because otherwise mirror was used to reach the grave, so would cancel a pre-existing mirror spot)
         # to account for insanity, must consider a way to escape without a cave for basic_routes
         # -> (M and Mitts) or ((Mitts or Flute or (M and P and West Dark World access)) and BR)
-        add_rule(world.get_entrance('Pyramid Fairy'), lambda state: (state.can_lift_heavy_rocks() and state.has_Mirror()) or ((state.can_lift_heavy_rocks() or state.has('Ocarina') or (state.can_reach('West Dark World', 'Region') and state.has_Pearl() and state.has_Mirror())) and basic_routes(state)))
+        add_rule(world.get_entrance('Pyramid Fairy'), (Has('Titans Mitts') & Has('Magic Mirror')) | ((Has('Titans Mitts') | Has('Ocarina') | (CanReach('West Dark World', 'Region') & Has('Moon Pearl') & Has('Magic Mirror'))) & basic_routes))
 
 def set_bunny_rules(world):
 
@@ -846,19 +949,19 @@ def set_bunny_rules(world):
 
 
     def path_to_access_rule(path, entrance):
-        return lambda state: state.can_reach(entrance) and all(rule(state) for rule in path)
+        return AllOf(CanReach(entrance), *path)
 
     def options_to_access_rule(options):
-        return lambda state: any(rule(state) for rule in options)
+        return AnyOf(*options)
 
     def get_rule_to_add(region):
         if not region.is_light_world:
-            return lambda state: state.has_Pearl()
+            return Has('Moon Pearl')
         # in this case we are mixed region.
         # we collect possible options.
 
         # The base option is having the moon pearl
-        possible_options = [lambda state: state.has_Pearl()]
+        possible_options = [Has('Moon Pearl')]
 
         # We will search entrances recursively until we find
         # one that leads to an exclusively light world region
@@ -71,6 +71,16 @@ def output_path(path):
 
 output_path.cached_path = None
 
+def cache_path(path):
+    # for files only kept to speed up later runs, they can be deleted at any time
+    if cache_path.cached_path is None:
+        cache_path.cached_path = output_path('cache') if is_bundled() else local_path('cache')
+        if not os.path.exists(cache_path.cached_path):
+            os.makedirs(cache_path.cached_path, exist_ok=True)
+    return os.path.join(cache_path.cached_path, path)
+
+cache_path.cached_path = None
+
 def open_file(filename):
     if sys.platform == 'win32':
         os.startfile(filename)
@@ -96,27 +106,17 @@ def new_logic_array():
     print("logic_hash = ["+",\n              ".join(lines)+"]")
 
 def make_new_base2current(old_rom='Zelda no Densetsu - Kamigami no Triforce (Japan).sfc', new_rom='working.sfc'):
-    from collections import OrderedDict
-    import json
     import hashlib
+    from Rom import RomPatch
     with open(old_rom, 'rb') as stream:
         old_rom_data = bytearray(stream.read())
     with open(new_rom, 'rb') as stream:
         new_rom_data = bytearray(stream.read())
-    # extend to 2 mb
-    old_rom_data.extend(bytearray([0x00] * (2097152 - len(old_rom_data))))
-
-    out_data = OrderedDict()
-    for idx, old in enumerate(old_rom_data):
-        new = new_rom_data[idx]
-        if old != new:
-            out_data[idx] = [int(new)]
-    for offset in reversed(list(out_data.keys())):
-        if offset - 1 in out_data:
-            out_data[offset-1].extend(out_data.pop(offset))
-    with open('data/base2current.json', 'wt') as outfile:
-        json.dump([{key:value} for key, value in out_data.items()], outfile, separators=(",", ":"))
 
     basemd5 = hashlib.md5()
-    basemd5.update(new_rom_data)
-    return "New Rom Hash: " + basemd5.hexdigest()
+    basemd5.update(old_rom_data)
+    newmd5 = hashlib.md5()
+    newmd5.update(new_rom_data)
+    # the old rom is extended to 2 mb with zeros, unchanged bytes in between nearby changes are included
+    RomPatch.diff(old_rom_data, new_rom_data, source_hash=basemd5.hexdigest(), target_hash=newmd5.hexdigest()).write('data/base2current.bin')
+    return "New Rom Hash: " + newmd5.hexdigest()
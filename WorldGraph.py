@@ -0,0 +1,79 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class WorldGraph(object):
+    # the region graph of a world as flat arrays, as exported by World.export_graph. only needs numpy, so tools can
+    # load a saved graph without the rest of the randomizer
+    #
+    # regions, entrances and locations are numbered by their world ids. the exits of region r are the entrances
+    # exit_indptr[r] to exit_indptr[r + 1] - 1, each leading to entrance_targets[e] (-1 if unconnected).
+    # every entrance, location and spawn region refers to a rule, a rule passes if any of its clauses passes and a
+    # clause passes if the inventory holds term_counts[t] of term_items[t] for all of its terms. opaque rules depend on
+    # more than the inventory (other spots, item placements, shops) and have no clauses
+
+    arrays = ('exit_indptr', 'entrance_targets', 'entrance_rules', 'location_regions', 'location_rules', 'spawn_regions', 'spawn_rules',
+              'rule_indptr', 'clause_indptr', 'term_items', 'term_counts', 'opaque_rules')
+    names = ('region_names', 'entrance_names', 'location_names', 'item_names')
+
+    def __init__(self, **data):
+        if numpy is None:
+            raise RuntimeError('The world graph needs numpy, which is not installed.')
+        for name in self.names:
+            setattr(self, name, [str(value) for value in data[name]])
+        for name in self.arrays:
+            setattr(self, name, numpy.asarray(data[name], dtype=bool if name == 'opaque_rules' else numpy.int32))
+        self.item_index = {name: id for id, name in enumerate(self.item_names)}
+
+        # owner of every exit, term and clause, for evaluating all of them at once
+        self.entrance_sources = numpy.repeat(numpy.arange(len(self.region_names), dtype=numpy.int32), numpy.diff(self.exit_indptr))
+        self.term_clauses = numpy.repeat(numpy.arange(len(self.clause_indptr) - 1, dtype=numpy.int32), numpy.diff(self.clause_indptr))
+        self.clause_rules = numpy.repeat(numpy.arange(len(self.rule_indptr) - 1, dtype=numpy.int32), numpy.diff(self.rule_indptr))
+
+    def save(self, path):
+        numpy.savez_compressed(path, **{name: getattr(self, name) for name in self.names + self.arrays})
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path) as data:
+            return cls(**{name: data[name] for name in cls.names + cls.arrays})
+
+    def inventory(self, items):
+        # inventory vector from a mapping of item names to counts, e.g. CollectionState.prog_items
+        ret = numpy.zeros(len(self.item_names), dtype=numpy.int32)
+        for name, count in items.items():
+            if name in self.item_index:
+                ret[self.item_index[name]] = count
+        return ret
+
+    def evaluate_rules(self, inventory, opaque=False):
+        # which rules pass with the given inventory vector. the results of opaque rules are taken from opaque, either
+        # a single value for all of them or an array over all rules: False gives a lower bound of what is reachable,
+        # True an upper bound
+        met = inventory[self.term_items] >= self.term_counts
+        failed_terms = numpy.bincount(self.term_clauses, weights=~met, minlength=len(self.clause_indptr) - 1)
+        passed_clauses = numpy.bincount(self.clause_rules, weights=failed_terms == 0, minlength=len(self.rule_indptr) - 1)
+        return numpy.where(self.opaque_rules, opaque, passed_clauses > 0)
+
+    def reachable_regions(self, inventory, opaque=False):
+        passed = self.evaluate_rules(inventory, opaque)
+        reached = numpy.zeros(len(self.region_names), dtype=bool)
+        reached[self.spawn_regions[passed[self.spawn_rules]]] = True
+
+        usable = passed[self.entrance_rules] & (self.entrance_targets >= 0)
+        sources = self.entrance_sources[usable]
+        targets = self.entrance_targets[usable]
+        # one step further along every usable entrance per round, until nothing new is reached
+        while True:
+            expanded = reached.copy()
+            expanded[targets[reached[sources]]] = True
+            if numpy.array_equal(expanded, reached):
+                return reached
+            reached = expanded
+
+    def reachable_locations(self, inventory, opaque=False):
+        passed = self.evaluate_rules(inventory, opaque)
+        reached = self.reachable_regions(inventory, opaque)
+        return reached[self.location_regions] & passed[self.location_rules]
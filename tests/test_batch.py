@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+from argparse import Namespace
+
+from Main import main_batch, batch_seeds
+
+
+def make_args(**settings):
+    # command line defaults, writing only the spoiler of every seed
+    args = Namespace(logic='noglitches', mode='open', goal='ganon', difficulty='normal', timer='none', progressive='on', algorithm='balanced', shuffle='full',
+                     rom=None, sprite=None, fastmenu='normal', quickswap=False, disablemusic=False, keysanity=False, retro=False, custom=False, customitemarray=False,
+                     nodungeonitems=False, beatableonly=False, hints=False, shuffleganon=True, heartbeep='normal', heartcolor='red', shufflebosses='none',
+                     playthrough_workers=1, create_spoiler=True, suppress_rom=True, delta=False, jsonout=False)
+    for name, value in settings.items():
+        setattr(args, name, value)
+    return args
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def generate(self, seeds, workers, **settings):
+        # the spoilers of a batch by file name, every batch is written to a directory of its own
+        output = tempfile.mkdtemp(dir=self.directory)
+        os.chdir(output)
+        results = main_batch(make_args(**settings), seeds, workers)
+        self.assertEqual([(seed, error) for seed, _, error in results], [(seed, None) for seed in seeds])
+        spoilers = {}
+        for name in os.listdir(output):
+            with open(os.path.join(output, name)) as stream:
+                spoilers[name] = stream.read()
+        return spoilers
+
+    def test_batch_seeds(self):
+        seeds = batch_seeds(5, 20)
+        self.assertEqual(seeds, batch_seeds(5, 20))
+        self.assertEqual(seeds[0], 5)
+        self.assertEqual(len(set(seeds)), 20)
+
+    def test_worker_counts(self):
+        seeds = batch_seeds(5, 3)
+        serial = self.generate(seeds, 1)
+        self.assertEqual(len(serial), 3)
+        self.assertEqual(self.generate(seeds, 2), serial)
+        # batch workers cannot start playthrough pools of their own, they have to ignore the setting
+        self.assertEqual(self.generate(seeds, 2, playthrough_workers=2), serial)
+
+    def test_failing_seed(self):
+        # a failing seed is reported and the others are still generated
+        results = main_batch(make_args(create_spoiler=False, algorithm='unknown'), [1, 2], 1)
+        self.assertEqual([seed for seed, _, _ in results], [1, 2])
+        self.assertTrue(all(error is not None for _, _, error in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from BaseClasses import World
+from Dungeons import create_dungeons, fill_dungeons_restrictive
+from EntranceShuffle import link_entrances
+from Fill import distribute_items_restrictive
+from ItemList import generate_itempool, difficulties, fill_prizes
+from Main import gt_filler
+from Regions import create_regions, mark_light_world_regions
+from Rules import set_rules
+
+
+def make_world(seed, shuffle='full', mode='open', keysanity=False, retro=False):
+    # a world as main has it right before the main fill
+    world = World(shuffle, 'noglitches', mode, 'normal', 'none', 'on', 'ganon', 'balanced', True, False, True, False, 'normal', False, keysanity, retro, False, False, 'none', False)
+    world.seed = seed
+    random.seed(seed)
+    world.difficulty_requirements = difficulties[world.difficulty]
+    create_regions(world)
+    create_dungeons(world)
+    link_entrances(world)
+    mark_light_world_regions(world)
+    generate_itempool(world)
+    set_rules(world)
+    fill_prizes(world)
+    shuffled_locations = world.get_unfilled_locations()
+    random.shuffle(shuffled_locations)
+    fill_dungeons_restrictive(world, shuffled_locations)
+    return world
+
+def fill(world, seed):
+    random.seed(seed)
+    distribute_items_restrictive(world, gt_filler(world))
+    return [(location.name, location.item.name if location.item is not None else None) for location in world.get_locations()]
+
+
+class CloneTest(unittest.TestCase):
+
+    def check(self, seed, **settings):
+        world = make_world(seed, **settings)
+        before = [(location.name, location.item) for location in world.get_locations()]
+        cloned = fill(world.clone(), seed)
+        # filling the clone leaves the original as it was
+        self.assertEqual([(location.name, location.item) for location in world.get_locations()], before)
+        self.assertEqual(fill(world, seed), cloned)
+
+    def test_default(self):
+        self.check(1)
+
+    def test_crossed_standard(self):
+        self.check(2, shuffle='crossed', mode='standard')
+
+    def test_keysanity_retro(self):
+        self.check(3, keysanity=True, retro=True)
+
+    def test_can_beat_game(self):
+        world = make_world(4)
+        fill(world, 4)
+        clone = world.clone()
+        self.assertTrue(clone.can_beat_game())
+        # taking the triforce out of the clone leaves the original beatable
+        clone.get_location('Ganon').item = None
+        self.assertFalse(clone.can_beat_game())
+        self.assertTrue(world.can_beat_game())
+
+
+if __name__ == '__main__':
+    unittest.main()
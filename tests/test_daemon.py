@@ -0,0 +1,88 @@
+import http.client
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from Daemon import GenerationServer, RequestHandler, TCPServer, make_args
+
+
+class MakeArgsTest(unittest.TestCase):
+
+    def test_defaults(self):
+        args, seed = make_args({})
+        self.assertEqual(seed, None)
+        self.assertTrue(args.jsonout)
+        self.assertEqual((args.mode, args.shuffle, args.hints, args.shuffleganon), ('open', 'full', False, True))
+
+    def test_settings(self):
+        args, seed = make_args({'seed': 5, 'mode': 'standard', 'hints': True, 'shuffleganon': False})
+        self.assertEqual((seed, args.mode, args.hints, args.shuffleganon), (5, 'standard', True, False))
+
+    def test_invalid(self):
+        for request in [[], {'unknown': 1}, {'timer': 'sometimes'}, {'hints': 'yes'}, {'mode': 1}, {'seed': 'abc'}, {'seed': -1}]:
+            with self.assertRaises(ValueError):
+                make_args(request)
+
+
+class ServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # one worker and no queue, so a single request in progress fills the server
+        cls.server = TCPServer(('127.0.0.1', 0), RequestHandler)
+        cls.server.generation = GenerationServer(1, 0, logging.ERROR)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+        cls.server.generation.close()
+
+    def post(self, body, path='/generate'):
+        connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=300)
+        try:
+            connection.request('POST', path, body=body.encode('utf-8'), headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, response.read().decode('utf-8')
+        finally:
+            connection.close()
+
+    def test_jsonout(self):
+        # the response is exactly what the command line prints with --jsonout
+        status, body = self.post(json.dumps({'seed': 5, 'mode': 'standard', 'hints': True}))
+        self.assertEqual(status, 200)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, os.path.join(root, 'EntranceRandomizer.py'), '--jsonout', '--seed', '5', '--mode', 'standard', '--hints', '--loglevel', 'error'],
+                                         cwd=root, universal_newlines=True)
+        self.assertEqual(body, output)
+        self.assertEqual(sorted(json.loads(body)), ['patch', 'spoiler'])
+
+    def test_invalid(self):
+        status, body = self.post(json.dumps({'timer': 'sometimes'}))
+        self.assertEqual(status, 400)
+        self.assertIn('timer', json.loads(body)['error'])
+        status, body = self.post('not json')
+        self.assertEqual(status, 400)
+        status, body = self.post('{}', path='/other')
+        self.assertEqual(status, 404)
+
+    def test_full(self):
+        slots = self.server.generation.slots
+        self.assertTrue(slots.acquire(blocking=False))
+        try:
+            status, body = self.post(json.dumps({'seed': 5}))
+        finally:
+            slots.release()
+        self.assertEqual(status, 503)
+        self.assertIn('error', json.loads(body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from Rom import JsonRom, PatchRecorder
+
+
+class PatchRecorderTest(unittest.TestCase):
+
+    def test_coalescing(self):
+        rom = JsonRom()
+        rom.write_bytes(0x100, [1, 2, 3])
+        # adjacent
+        rom.write_bytes(0x103, [4, 5])
+        rom.write_bytes(0x200, [6, 7, 8, 9])
+        # overlapping, the last write wins
+        rom.write_bytes(0x202, [10, 11, 12])
+        rom.write_byte(0x1FF, 13)
+        rom.write_int16(0x300, 0x1234)
+        self.assertEqual(list(rom.extents()), [(0x100, bytes([1, 2, 3, 4, 5])), (0x1FF, bytes([13, 6, 7, 10, 11, 12])), (0x300, bytes([0x34, 0x12]))])
+        self.assertEqual(rom.patches, {'256': [1, 2, 3, 4, 5], '511': [13, 6, 7, 10, 11, 12], '768': [0x34, 0x12]})
+
+    def test_apply(self):
+        rom = PatchRecorder(bytearray(16))
+        rom.write_bytes(2, [1, 1])
+        rom.write_bytes(3, [2, 2])
+        rom.write_bytes(12, [])
+        self.assertEqual(rom.apply(bytearray(b'\xFF' * 16)), bytearray(b'\xFF\xFF\x01\x02\x02' + b'\xFF' * 11))
+
+    def test_past_the_end(self):
+        rom = PatchRecorder(bytearray(16))
+        with self.assertRaises(IndexError):
+            rom.write_bytes(15, [1, 2])
+        self.assertEqual(list(rom.extents()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from Rom import RomPatch
+
+
+class RomPatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file = os.path.join(self.directory, 'test.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        old = bytes(range(256)) * 64
+        new = bytearray(old)
+        new[0x10:0x14] = b'\xFF\xFF\xFF\xFF'
+        new[0x1000] ^= 0x01
+        # a patched rom may be larger than the one it is made from
+        new.extend(b'tail')
+        source_hash, target_hash = hashlib.md5(old).hexdigest(), hashlib.md5(new).hexdigest()
+        for compress in [True, False]:
+            RomPatch.diff(old, new, source_hash=source_hash, target_hash=target_hash).write(self.file, compress)
+            patch = RomPatch.read(self.file)
+            self.assertEqual((patch.size, patch.source_hash, patch.target_hash), (len(new), source_hash, target_hash))
+            self.assertEqual(patch.apply(bytearray(old)), new)
+
+    def test_unknown_hashes(self):
+        RomPatch.diff(b'\0' * 16, b'\1' * 16).write(self.file)
+        patch = RomPatch.read(self.file)
+        self.assertEqual((patch.source_hash, patch.target_hash), (None, None))
+
+    def test_damaged(self):
+        RomPatch.diff(b'\0' * 64, b'\1' * 64).write(self.file, compress=False)
+        with open(self.file, 'r+b') as stream:
+            stream.seek(-1, os.SEEK_END)
+            stream.write(b'\2')
+        with self.assertRaisesRegex(RuntimeError, 'checksum'):
+            RomPatch.read(self.file)
+
+    def test_not_a_patch(self):
+        with open(self.file, 'wb') as stream:
+            stream.write(b'\0' * 128)
+        with self.assertRaisesRegex(RuntimeError, 'not a rom patch'):
+            RomPatch.read(self.file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from BaseClasses import World, CollectionState
+from Dungeons import create_dungeons
+from EntranceShuffle import link_entrances
+from ItemList import generate_itempool, difficulties
+from Regions import create_regions, mark_light_world_regions
+from Rules import set_rules
+from WorldGraph import numpy
+
+
+def make_world(seed, shuffle='full'):
+    # a world with its rules set and nothing placed yet
+    world = World(shuffle, 'noglitches', 'open', 'normal', 'none', 'on', 'ganon', 'balanced', True, False, True, False, 'normal', False, False, False, False, False, 'none', False)
+    world.seed = seed
+    random.seed(seed)
+    world.difficulty_requirements = difficulties[world.difficulty]
+    create_regions(world)
+    create_dungeons(world)
+    link_entrances(world)
+    mark_light_world_regions(world)
+    generate_itempool(world)
+    set_rules(world)
+    return world
+
+
+@unittest.skipIf(numpy is None, 'The world graph needs numpy.')
+class WorldGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = make_world(1)
+        self.graph = self.world.export_graph()
+
+    def test_counts(self):
+        world, graph = self.world, self.graph
+        entrances = [exit for region in world.regions for exit in region.exits]
+        self.assertEqual(graph.region_names, [region.name for region in world.regions])
+        self.assertEqual(len(graph.exit_indptr), len(world.regions) + 1)
+        self.assertEqual(graph.exit_indptr[-1], len(entrances))
+        self.assertEqual(len(graph.entrance_targets), len(entrances))
+        self.assertEqual(len(graph.location_regions), len(world.get_locations()))
+
+    def test_connections(self):
+        world, graph = self.world, self.graph
+        for id, region in enumerate(world.regions):
+            exits = range(graph.exit_indptr[id], graph.exit_indptr[id + 1])
+            self.assertEqual([graph.entrance_names[exit] for exit in exits], [exit.name for exit in region.exits])
+            self.assertEqual([graph.region_names[graph.entrance_targets[exit]] if graph.entrance_targets[exit] >= 0 else None for exit in exits],
+                             [exit.connected_region.name if exit.connected_region is not None else None for exit in region.exits])
+        for location, region in zip(world.get_locations(), graph.location_regions):
+            self.assertEqual(graph.region_names[region], location.parent_region.name)
+
+    def test_reachable_regions(self):
+        # the opaque rules taken as failing and as passing bound what the world itself finds reachable
+        world, graph = self.world, self.graph
+        states = [CollectionState(world), CollectionState(world)]
+        for item in world.itempool:
+            states[1].collect(item, True)
+        for state in states:
+            inventory = graph.inventory(state.prog_items)
+            reachable = numpy.array([state.can_reach(region) for region in world.regions])
+            lower = graph.reachable_regions(inventory, False)
+            upper = graph.reachable_regions(inventory, True)
+            self.assertTrue(numpy.all(lower <= reachable))
+            self.assertTrue(numpy.all(reachable <= upper))
+            self.assertTrue(lower.any())
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'graph.npz')
+            self.graph.save(path)
+            loaded = type(self.graph).load(path)
+        finally:
+            shutil.rmtree(directory)
+        for name in self.graph.names:
+            self.assertEqual(getattr(loaded, name), getattr(self.graph, name))
+        for name in self.graph.arrays:
+            self.assertTrue(numpy.array_equal(getattr(loaded, name), getattr(self.graph, name)))
+
+
+if __name__ == '__main__':
+    unittest.main()